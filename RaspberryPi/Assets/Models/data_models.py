@@ -1,13 +1,120 @@
 """
 Data Models - JSON payload structures for communication
+
+to_bytes()/from_bytes() use MessagePack: same shape as the JSON payload,
+but binary and roughly half the size on the wire.
 """
 
-from dataclasses import dataclass, asdict
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, asdict, fields
 from typing import Optional, List
 from datetime import datetime
 
-
-@dataclass
+# Fast JSON encoders: msgspec encodes dataclasses straight from their
+# fields in C; orjson is the next best; stdlib json is the fallback
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+    _JSON_ENCODER = msgspec.json.Encoder()
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+    _JSON_ENCODER = None
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+import json
+
+
+def _dumps(obj) -> bytes:
+    """Serialize a dataclass to JSON bytes."""
+    if MSGSPEC_AVAILABLE:
+        return _JSON_ENCODER.encode(obj)
+    if ORJSON_AVAILABLE:
+        # orjson serializes dataclasses natively, no asdict() round-trip
+        return orjson.dumps(obj)
+    return json.dumps(obj.to_dict()).encode()
+
+
+def _loads(cls, buf: bytes):
+    """Parse JSON bytes into an instance of a dataclass."""
+    if MSGSPEC_AVAILABLE:
+        # Decodes and type-checks directly into cls; unknown keys are ignored
+        return msgspec.json.decode(buf, type=cls)
+    if ORJSON_AVAILABLE:
+        return cls.from_dict(orjson.loads(buf))
+    return cls.from_dict(json.loads(buf))
+
+
+# MessagePack wire format
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+    _PACKER = msgpack.Packer(use_bin_type=True)
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    _PACKER = None
+
+
+def _pack(obj) -> bytes:
+    """Serialize a dataclass to MessagePack bytes."""
+    if not MSGPACK_AVAILABLE:
+        raise RuntimeError("msgpack not installed - run: pip install msgpack")
+    return _PACKER.pack(obj.to_dict())
+
+
+def _unpack(buf: bytes) -> dict:
+    """Parse MessagePack bytes into a dict."""
+    if not MSGPACK_AVAILABLE:
+        raise RuntimeError("msgpack not installed - run: pip install msgpack")
+    return msgpack.unpackb(buf, raw=False)
+
+
+# Pressure classification: upper PSI bound (inclusive) of each level
+_PSI_EDGES = (0.5, 1.5, 2.5, 3.5)
+_PSI_NAMES = ("none", "light", "moderate", "firm", "squeeze")
+
+# ESP32 motion string -> standardized motion type
+_MOTION_MAP = {
+    "None": "none",
+    "Still": "none",
+    "Gentle Movement": "gentle",
+    "Tremble": "tremble",
+    "Shake": "shake",
+    "Violent Shake": "shake",
+    "Impact": "impact",
+    "Free Fall": "impact",
+}
+
+# (millisecond, formatted string) of the last generated timestamp
+_ts_cache = (0, "")
+
+
+def _now_iso() -> str:
+    """Current time in ISO format, formatted at most once per millisecond."""
+    global _ts_cache
+    now_ns = time.time_ns()
+    now_ms = now_ns // 1_000_000
+    cached_ms, cached_str = _ts_cache
+    if now_ms != cached_ms:
+        cached_str = datetime.fromtimestamp(now_ns / 1e9).isoformat()
+        _ts_cache = (now_ms, cached_str)
+    return cached_str
+
+
+def _cache_fields(cls):
+    """Cache field names on the class so to_dict()/from_dict() skip per-call introspection."""
+    cls._FIELDS = tuple(f.name for f in fields(cls))
+    cls._FIELD_SET = frozenset(cls._FIELDS)
+    return cls
+
+
+@_cache_fields
+@dataclass(slots=True)
 class SensorReading:
     """DHT22 sensor reading from Pi"""
     temperature: float
@@ -16,13 +123,14 @@ class SensorReading:
 
     def __post_init__(self):
         if not self.timestamp:
-            self.timestamp = datetime.now().isoformat()
+            self.timestamp = _now_iso()
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {name: getattr(self, name) for name in self._FIELDS}
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class ESP32Data:
     """Data received from ESP32"""
     pressure: float = 0.0           # Pressure sensor value
@@ -34,13 +142,14 @@ class ESP32Data:
 
     def __post_init__(self):
         if not self.timestamp:
-            self.timestamp = datetime.now().isoformat()
+            self.timestamp = _now_iso()
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {name: getattr(self, name) for name in self._FIELDS}
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class FaceEvent:
     """Face recognition event"""
     recognized: bool
@@ -50,13 +159,14 @@ class FaceEvent:
 
     def __post_init__(self):
         if not self.timestamp:
-            self.timestamp = datetime.now().isoformat()
+            self.timestamp = _now_iso()
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {name: getattr(self, name) for name in self._FIELDS}
 
 
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class PiHubData:
     """
     Main JSON payload sent from Pi to Mobile App
@@ -88,44 +198,54 @@ class PiHubData:
 
     def __post_init__(self):
         if not self.timestamp:
-            self.timestamp = datetime.now().isoformat()
+            self.timestamp = _now_iso()
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization"""
-        return asdict(self)
+        return {name: getattr(self, name) for name in self._FIELDS}
 
-    def to_json(self) -> str:
-        """Convert to JSON string"""
-        import json
-        return json.dumps(self.to_dict())
+    def to_json(self) -> bytes:
+        """Convert to JSON bytes (ready for socket/BLE writes)"""
+        return _dumps(self)
+
+    @classmethod
+    def from_json(cls, buf: bytes) -> "PiHubData":
+        """Create instance from JSON bytes"""
+        return _loads(cls, buf)
 
     @classmethod
     def from_dict(cls, data: dict) -> "PiHubData":
         """Create instance from dictionary"""
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return cls(**{k: data[k] for k in cls._FIELD_SET & data.keys()})
+
+    def to_bytes(self) -> bytes:
+        """Convert to MessagePack bytes"""
+        return _pack(self)
+
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> "PiHubData":
+        """Create instance from MessagePack bytes"""
+        return cls.from_dict(_unpack(buf))
 
     def update_from_sensor(self, reading: SensorReading):
         """Update with sensor reading"""
-        self.temperature = reading.temperature
-        self.humidity = reading.humidity
+        self.temperature, self.humidity = reading.temperature, reading.humidity
 
     def update_from_esp32(self, esp32_data: ESP32Data):
         """Update with ESP32 data"""
-        self.pressure = esp32_data.pressure
-        self.motion_detected = esp32_data.motion_detected
-        self.latitude = esp32_data.latitude
-        self.longitude = esp32_data.longitude
-        self.is_playing_sound = esp32_data.is_playing_sound
-        self.esp32_connected = True
+        (self.pressure, self.motion_detected, self.latitude,
+         self.longitude, self.is_playing_sound, self.esp32_connected) = (
+            esp32_data.pressure, esp32_data.motion_detected, esp32_data.latitude,
+            esp32_data.longitude, esp32_data.is_playing_sound, True)
 
     def update_from_face_event(self, event: FaceEvent):
         """Update with face recognition event"""
-        self.face_recognized = event.recognized
-        self.face_name = event.name
+        self.face_recognized, self.face_name = event.recognized, event.name
 
 
 # Command models for receiving data from mobile app
-@dataclass
+@_cache_fields
+@dataclass(slots=True)
 class SensorPayload:
     """
     Sensor data payload sent to mobile app.
@@ -145,50 +265,42 @@ class SensorPayload:
 
     def __post_init__(self):
         if not self.timestamp:
-            self.timestamp = datetime.now().isoformat() + "Z"
+            self.timestamp = _now_iso() + "Z"
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {name: getattr(self, name) for name in self._FIELDS}
 
-    def to_json(self) -> str:
-        import json
-        return json.dumps(self.to_dict())
+    def to_json(self) -> bytes:
+        return _dumps(self)
+
+    @classmethod
+    def from_json(cls, buf: bytes) -> "SensorPayload":
+        return _loads(cls, buf)
 
     @classmethod
     def from_dict(cls, data: dict) -> "SensorPayload":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return cls(**{k: data[k] for k in cls._FIELD_SET & data.keys()})
+
+    def to_bytes(self) -> bytes:
+        return _pack(self)
+
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> "SensorPayload":
+        return cls.from_dict(_unpack(buf))
 
     @staticmethod
     def get_pressure_type(psi: float) -> str:
         """Convert PSI value to pressure type string."""
-        if psi <= 0.5:
-            return "none"
-        elif psi <= 1.5:
-            return "light"
-        elif psi <= 2.5:
-            return "moderate"
-        elif psi <= 3.5:
-            return "firm"
-        else:
-            return "squeeze"
+        return _PSI_NAMES[bisect_left(_PSI_EDGES, psi)]
 
     @staticmethod
     def get_motion_type(motion_str: str) -> str:
         """Convert ESP32 motion string to standardized motion type."""
-        motion_mapping = {
-            "None": "none",
-            "Still": "none",
-            "Gentle Movement": "gentle",
-            "Tremble": "tremble",
-            "Shake": "shake",
-            "Violent Shake": "shake",
-            "Impact": "impact",
-            "Free Fall": "impact",
-        }
-        return motion_mapping.get(motion_str, "none")
-
-
-@dataclass
+        return _MOTION_MAP.get(motion_str, "none")
+
+
+@_cache_fields
+@dataclass(slots=True)
 class EmotionPayload:
     """
     Emotion detection payload sent to mobile app.
@@ -206,21 +318,31 @@ class EmotionPayload:
 
     def __post_init__(self):
         if not self.timestamp:
-            self.timestamp = datetime.now().isoformat() + "Z"
+            self.timestamp = _now_iso() + "Z"
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {name: getattr(self, name) for name in self._FIELDS}
+
+    def to_json(self) -> bytes:
+        return _dumps(self)
 
-    def to_json(self) -> str:
-        import json
-        return json.dumps(self.to_dict())
+    @classmethod
+    def from_json(cls, buf: bytes) -> "EmotionPayload":
+        return _loads(cls, buf)
 
     @classmethod
     def from_dict(cls, data: dict) -> "EmotionPayload":
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        return cls(**{k: data[k] for k in cls._FIELD_SET & data.keys()})
+
+    def to_bytes(self) -> bytes:
+        return _pack(self)
+
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> "EmotionPayload":
+        return cls.from_dict(_unpack(buf))
 
 
-@dataclass
+@dataclass(slots=True)
 class MobileCommand:
     """Command received from mobile app"""
     command: str                    # Command type
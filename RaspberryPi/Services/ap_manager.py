@@ -18,16 +18,24 @@ Dependencies:
 """
 
 import asyncio
-import subprocess
 import os
 import re
 import secrets
-import string
+import socket
+import struct
+import fcntl
 import logging
 from typing import Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+# Netlink interface queries (avoids spawning ip/grep to check the address)
+try:
+    from pyroute2 import IPRoute
+    PYROUTE2_AVAILABLE = True
+except ImportError:
+    PYROUTE2_AVAILABLE = False
+
 # Import settings
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -35,6 +43,12 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Matches the first network block's ssid and (optional) psk in one scan
+_WPA_NETWORK_RE = re.compile(r'ssid="([^"]+)"(?:.*?psk="([^"]*)")?', re.S)
+
+# ioctl request to read an interface's IPv4 address (linux/sockios.h)
+_SIOCGIFADDR = 0x8915
+
 
 class APState(Enum):
     """Access Point state machine states"""
@@ -71,6 +85,43 @@ class APManager:
     DNSMASQ_CONF = "/tmp/dnsmasq_stream.conf"
     WIFI_BACKUP_FILE = "/tmp/wifi_backup.conf"
 
+    # Configuration file templates
+    HOSTAPD_TEMPLATE = """# Hostapd configuration for Calm Orb Live Streaming
+interface=wlan0
+driver=nl80211
+ssid={ssid}
+hw_mode=g
+channel={channel}
+wmm_enabled=0
+macaddr_acl=0
+auth_algs=1
+ignore_broadcast_ssid=0
+wpa=2
+wpa_passphrase={password}
+wpa_key_mgmt=WPA-PSK
+rsn_pairwise=CCMP
+"""
+
+    DNSMASQ_TEMPLATE = """# Dnsmasq configuration for Calm Orb Live Streaming
+interface=wlan0
+dhcp-range={dhcp_start},{dhcp_end},{netmask},24h
+
+# Redirect all DNS queries to Pi (captive portal style)
+address=/#/{ip}
+
+# Specific entries for connectivity checks (makes phones think internet works)
+address=/connectivitycheck.gstatic.com/{ip}
+address=/www.gstatic.com/{ip}
+address=/captive.apple.com/{ip}
+address=/www.apple.com/{ip}
+address=/clients3.google.com/{ip}
+address=/play.googleapis.com/{ip}
+
+# Disable upstream DNS (we're not routing to internet)
+no-resolv
+no-poll
+"""
+
     def __init__(self):
         self.state = APState.CLIENT_MODE
         self.saved_credentials: Optional[WiFiCredentials] = None
@@ -81,6 +132,23 @@ class APManager:
         self._ap_channel = settings.STREAM_AP_CHANNEL
         self._dhcp_start = settings.STREAM_DHCP_START
         self._dhcp_end = settings.STREAM_DHCP_END
+        self._saved_wpa_mtime: Optional[float] = None
+        self._ipr = None  # Lazily opened pyroute2 netlink socket
+
+        # Render the static parts of the configs once; only the hostapd
+        # password changes between AP starts
+        self._hostapd_template = self.HOSTAPD_TEMPLATE.format(
+            ssid=self._ap_ssid.replace("{", "{{").replace("}", "}}"),
+            channel=self._ap_channel,
+            password="{password}",
+        )
+        self._dnsmasq_config = self.DNSMASQ_TEMPLATE.format(
+            dhcp_start=self._dhcp_start,
+            dhcp_end=self._dhcp_end,
+            netmask=self._ap_netmask,
+            ip=self._ap_ip,
+        )
+        self._dnsmasq_written = False
 
     @property
     def ap_ssid(self) -> str:
@@ -91,37 +159,94 @@ class APManager:
         return self._ap_ip
 
     def _generate_password(self, length: int = 8) -> str:
-        """Generate a random AP password"""
-        alphabet = string.ascii_letters + string.digits
-        return ''.join(secrets.choice(alphabet) for _ in range(length))
-
-    def _run_command(self, cmd: str, check: bool = True) -> Tuple[bool, str]:
-        """Run a shell command and return success status and output"""
+        """Generate a random AP password (single urandom read, URL-safe base64)"""
+        return secrets.token_urlsafe(length)[:length]
+
+    def _get_wlan0_ipv4(self) -> Optional[str]:
+        """Return wlan0's IPv4 address, or None if it has none."""
+        if PYROUTE2_AVAILABLE:
+            if self._ipr is None:
+                self._ipr = IPRoute()
+            addrs = self._ipr.get_addr(label='wlan0', family=socket.AF_INET)
+            return addrs[0].get_attr('IFA_ADDRESS') if addrs else None
+
+        # Fallback: SIOCGIFADDR ioctl (stdlib only, raises if no address)
         try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            if check and result.returncode != 0:
-                logger.error(f"Command failed: {cmd}")
-                logger.error(f"stderr: {result.stderr}")
-                return False, result.stderr
-            return True, result.stdout
-        except subprocess.TimeoutExpired:
-            logger.error(f"Command timed out: {cmd}")
-            return False, "Command timed out"
-        except Exception as e:
-            logger.error(f"Command error: {cmd} - {e}")
-            return False, str(e)
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                ifreq = fcntl.ioctl(sock.fileno(), _SIOCGIFADDR, struct.pack('256s', b'wlan0'))
+            return socket.inet_ntoa(ifreq[20:24])
+        except OSError:
+            return None
+
+    @staticmethod
+    def _process_running(name: str) -> bool:
+        """Check for a process by name by scanning /proc (no pgrep subprocess)"""
+        for pid in os.listdir('/proc'):
+            if not pid.isdigit():
+                continue
+            try:
+                with open(f'/proc/{pid}/comm', 'rb') as f:
+                    if f.read().rstrip(b'\n').decode() == name:
+                        return True
+            except OSError:
+                continue  # Process exited while scanning
+        return False
+
+    async def _process_running_async(self, name: str) -> bool:
+        """_process_running() on a worker thread, keeping the /proc scan off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, self._process_running, name)
+
+    async def _process_gone(self, name: str) -> bool:
+        """Inverse of _process_running_async(), for _wait_until()"""
+        return not await self._process_running_async(name)
+
+    async def _hostapd_beaconing(self) -> bool:
+        """hostapd is running and wlan0 is up"""
+        return self._wlan0_operstate() == "up" and await self._process_running_async("hostapd")
+
+    async def _wlan0_unmanaged(self) -> bool:
+        """Check whether NetworkManager has finished releasing wlan0"""
+        _, output = await self._exec(
+            "nmcli", "-t", "-f", "GENERAL.STATE", "device", "show", "wlan0", check=False
+        )
+        return "unmanaged" in output
+
+    @staticmethod
+    def _wlan0_operstate() -> str:
+        """Read wlan0's operational state from sysfs ("up" once hostapd is beaconing)"""
+        try:
+            with open('/sys/class/net/wlan0/operstate') as f:
+                return f.read().strip()
+        except OSError:
+            return "unknown"
+
+    @staticmethod
+    async def _wait_until(cond, timeout: float, interval: float = 0.05) -> bool:
+        """
+        Poll cond() until it returns True or timeout seconds pass.
+        cond may be a plain function or return an awaitable.
+
+        Returns:
+            bool: True if the condition was met before the timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            result = cond()
+            if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+                result = await result
+            if result:
+                return True
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(interval)
 
-    async def _run_command_async(self, cmd: str, check: bool = True) -> Tuple[bool, str]:
-        """Run a shell command asynchronously"""
+    async def _exec(self, *argv: str, check: bool = True) -> Tuple[bool, str]:
+        """Run a command (pre-split argv, no shell) asynchronously"""
+        cmd = " ".join(argv)
         try:
-            proc = await asyncio.create_subprocess_shell(
-                cmd,
+            proc = await asyncio.create_subprocess_exec(
+                *argv,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
@@ -147,21 +272,27 @@ class APManager:
             bool: True if credentials saved successfully
         """
         try:
-            if not os.path.exists(self.WPA_SUPPLICANT_CONF):
+            try:
+                mtime = os.stat(self.WPA_SUPPLICANT_CONF).st_mtime
+            except FileNotFoundError:
                 logger.warning("wpa_supplicant.conf not found, assuming no Wi-Fi configured")
                 return True
 
+            # Skip re-parsing if the file hasn't changed since the last save
+            if self.saved_credentials and mtime == self._saved_wpa_mtime:
+                logger.info(f"Wi-Fi credentials unchanged for network: {self.saved_credentials.ssid}")
+                return True
+
             with open(self.WPA_SUPPLICANT_CONF, 'r') as f:
                 content = f.read()
 
             # Parse the current network block
             # Look for: network={ ssid="..." psk="..." }
-            ssid_match = re.search(r'ssid="([^"]+)"', content)
-            psk_match = re.search(r'psk="([^"]+)"', content)
+            match = _WPA_NETWORK_RE.search(content)
 
-            if ssid_match:
-                ssid = ssid_match.group(1)
-                password = psk_match.group(1) if psk_match else ""
+            if match:
+                ssid = match.group(1)
+                password = match.group(2) or ""
 
                 self.saved_credentials = WiFiCredentials(
                     ssid=ssid,
@@ -173,6 +304,7 @@ class APManager:
                     f.write(f"ssid={ssid}\n")
                     f.write(f"password={password}\n")
 
+                self._saved_wpa_mtime = mtime
                 logger.info(f"Saved Wi-Fi credentials for network: {ssid}")
                 return True
             else:
@@ -183,6 +315,15 @@ class APManager:
             logger.error(f"Failed to save Wi-Fi credentials: {e}")
             return False
 
+    @staticmethod
+    def _write_config(path: str, config: str):
+        """Write a config file with a single os.write (no buffered text layer)"""
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.write(fd, config.encode('utf-8'))
+        finally:
+            os.close(fd)
+
     def _create_hostapd_config(self) -> bool:
         """Create hostapd configuration file"""
         try:
@@ -192,24 +333,8 @@ class APManager:
             else:
                 self.ap_password = self._generate_password()
 
-            config = f"""# Hostapd configuration for Calm Orb Live Streaming
-interface=wlan0
-driver=nl80211
-ssid={self._ap_ssid}
-hw_mode=g
-channel={self._ap_channel}
-wmm_enabled=0
-macaddr_acl=0
-auth_algs=1
-ignore_broadcast_ssid=0
-wpa=2
-wpa_passphrase={self.ap_password}
-wpa_key_mgmt=WPA-PSK
-rsn_pairwise=CCMP
-"""
-
-            with open(self.HOSTAPD_CONF, 'w') as f:
-                f.write(config)
+            config = self._hostapd_template.format(password=self.ap_password)
+            self._write_config(self.HOSTAPD_CONF, config)
 
             logger.info(f"Created hostapd config: SSID={self._ap_ssid}, Channel={self._ap_channel}")
             return True
@@ -221,28 +346,12 @@ rsn_pairwise=CCMP
     def _create_dnsmasq_config(self) -> bool:
         """Create dnsmasq (DHCP) configuration file"""
         try:
-            config = f"""# Dnsmasq configuration for Calm Orb Live Streaming
-interface=wlan0
-dhcp-range={self._dhcp_start},{self._dhcp_end},{self._ap_netmask},24h
-
-# Redirect all DNS queries to Pi (captive portal style)
-address=/#/{self._ap_ip}
-
-# Specific entries for connectivity checks (makes phones think internet works)
-address=/connectivitycheck.gstatic.com/{self._ap_ip}
-address=/www.gstatic.com/{self._ap_ip}
-address=/captive.apple.com/{self._ap_ip}
-address=/www.apple.com/{self._ap_ip}
-address=/clients3.google.com/{self._ap_ip}
-address=/play.googleapis.com/{self._ap_ip}
-
-# Disable upstream DNS (we're not routing to internet)
-no-resolv
-no-poll
-"""
+            # Contents never change at runtime, so skip the rewrite if our copy is still there
+            if self._dnsmasq_written and os.path.exists(self.DNSMASQ_CONF):
+                return True
 
-            with open(self.DNSMASQ_CONF, 'w') as f:
-                f.write(config)
+            self._write_config(self.DNSMASQ_CONF, self._dnsmasq_config)
+            self._dnsmasq_written = True
 
             logger.info(f"Created dnsmasq config: DHCP range {self._dhcp_start}-{self._dhcp_end}")
             return True
@@ -276,48 +385,57 @@ no-poll
 
             # Step 2: Tell NetworkManager to release wlan0
             logger.info("Disabling NetworkManager on wlan0...")
-            await self._run_command_async("sudo nmcli device set wlan0 managed no")
-            await asyncio.sleep(2)
+            await self._exec("sudo", "nmcli", "device", "set", "wlan0", "managed", "no")
+            # NM tears wlan0 down asynchronously; wait (bounded, as the old 2s settle)
+            # until it reports the device unmanaged before reconfiguring it
+            if not await self._wait_until(self._wlan0_unmanaged, timeout=2, interval=0.2):
+                logger.warning("NetworkManager still reports wlan0 as managed, continuing")
 
             # Step 3: Stop wpa_supplicant (client mode)
             logger.info("Stopping wpa_supplicant...")
-            await self._run_command_async("sudo systemctl stop wpa_supplicant", check=False)
-            await self._run_command_async("sudo killall wpa_supplicant", check=False)
-            await asyncio.sleep(1)
-
-            # Step 4: Kill any existing hostapd/dnsmasq
-            await self._run_command_async("sudo killall hostapd", check=False)
-            await self._run_command_async("sudo killall dnsmasq", check=False)
-            await asyncio.sleep(0.5)
+            await self._exec(
+                "sudo", "sh", "-c",
+                "systemctl stop wpa_supplicant; killall wpa_supplicant 2>/dev/null",
+                check=False
+            )
+            await self._wait_until(
+                lambda: self._process_gone("wpa_supplicant"), timeout=3, interval=0.2
+            )
 
-            # Step 5: Configure static IP on wlan0
+            # Step 4+5: Kill any existing hostapd/dnsmasq and configure static IP on wlan0
+            # (one shell instead of five separate subprocess launches)
             logger.info(f"Configuring static IP: {self._ap_ip}")
-            await self._run_command_async("sudo ip addr flush dev wlan0")
-            await self._run_command_async(f"sudo ip addr add {self._ap_ip}/24 dev wlan0")
-            await self._run_command_async("sudo ip link set wlan0 up")
-            await asyncio.sleep(0.5)
+            await self._exec(
+                "sudo", "sh", "-c",
+                "killall hostapd dnsmasq 2>/dev/null; "
+                "ip addr flush dev wlan0; "
+                f"ip addr add {self._ap_ip}/24 dev wlan0; "
+                "ip link set wlan0 up"
+            )
+            await self._wait_until(lambda: self._get_wlan0_ipv4() == self._ap_ip, timeout=1)
 
             # Step 6: Start hostapd
             logger.info("Starting hostapd...")
-            success, output = await self._run_command_async(
-                f"sudo hostapd -B {self.HOSTAPD_CONF}"
+            success, output = await self._exec(
+                "sudo", "hostapd", "-B", self.HOSTAPD_CONF
             )
             if not success:
                 raise Exception(f"Failed to start hostapd: {output}")
-            await asyncio.sleep(2)
+            await self._wait_until(self._hostapd_beaconing, timeout=2, interval=0.2)
 
             # Step 7: Start dnsmasq
             logger.info("Starting dnsmasq...")
-            success, output = await self._run_command_async(
-                f"sudo dnsmasq -C {self.DNSMASQ_CONF}"
+            success, output = await self._exec(
+                "sudo", "dnsmasq", "-C", self.DNSMASQ_CONF
             )
             if not success:
                 raise Exception(f"Failed to start dnsmasq: {output}")
-            await asyncio.sleep(1)
+            await self._wait_until(
+                lambda: self._process_running_async("dnsmasq"), timeout=1, interval=0.2
+            )
 
             # Verify AP is running
-            success, output = await self._run_command_async("pgrep hostapd", check=False)
-            if not success or not output.strip():
+            if not await self._process_running_async("hostapd"):
                 raise Exception("hostapd is not running")
 
             self.state = APState.AP_READY
@@ -349,21 +467,22 @@ no-poll
         logger.info("Stopping Access Point mode...")
 
         try:
-            # Stop hostapd
-            logger.info("Stopping hostapd...")
-            await self._run_command_async("sudo killall hostapd", check=False)
-
-            # Stop dnsmasq
-            logger.info("Stopping dnsmasq...")
-            await self._run_command_async("sudo killall dnsmasq", check=False)
+            # Stop hostapd and dnsmasq (independent, so run concurrently)
+            logger.info("Stopping hostapd and dnsmasq...")
+            await asyncio.gather(
+                self._exec("sudo", "killall", "hostapd", check=False),
+                self._exec("sudo", "killall", "dnsmasq", check=False),
+            )
 
             # Wait for processes to terminate
             await asyncio.sleep(1)
 
             # Clean up config files
-            for conf_file in [self.HOSTAPD_CONF, self.DNSMASQ_CONF]:
-                if os.path.exists(conf_file):
-                    os.remove(conf_file)
+            for conf_file in (self.HOSTAPD_CONF, self.DNSMASQ_CONF):
+                try:
+                    os.unlink(conf_file)
+                except FileNotFoundError:
+                    pass
 
             logger.info("Access Point stopped")
             return True
@@ -388,31 +507,28 @@ no-poll
             try:
                 # Re-enable NetworkManager on wlan0
                 logger.info("Re-enabling NetworkManager on wlan0...")
-                await self._run_command_async("sudo nmcli device set wlan0 managed yes", check=False)
+                await self._exec("sudo", "nmcli", "device", "set", "wlan0", "managed", "yes", check=False)
                 await asyncio.sleep(1)
 
                 # Flush IP configuration
-                await self._run_command_async("sudo ip addr flush dev wlan0", check=False)
+                await self._exec("sudo", "ip", "addr", "flush", "dev", "wlan0", check=False)
                 await asyncio.sleep(0.5)
 
                 # Restart wpa_supplicant
                 logger.info("Starting wpa_supplicant...")
-                await self._run_command_async("sudo systemctl start wpa_supplicant")
+                await self._exec("sudo", "systemctl", "start", "wpa_supplicant")
                 await asyncio.sleep(2)
 
                 # Request DHCP lease
                 logger.info("Requesting DHCP lease...")
-                await self._run_command_async("sudo dhclient wlan0", check=False)
+                await self._exec("sudo", "dhclient", "wlan0", check=False)
                 await asyncio.sleep(3)
 
                 # Verify connectivity
-                success, output = await self._run_command_async(
-                    "ip addr show wlan0 | grep 'inet '",
-                    check=False
-                )
+                ip_addr = self._get_wlan0_ipv4()
 
-                if success and output.strip():
-                    logger.info(f"Wi-Fi restored successfully: {output.strip()}")
+                if ip_addr:
+                    logger.info(f"Wi-Fi restored successfully: {ip_addr}")
                     self.state = APState.CLIENT_MODE
                     return True
 
@@ -425,13 +541,13 @@ no-poll
         # Final fallback: reboot the wlan0 interface
         logger.warning("All restore attempts failed, rebooting wlan0 interface...")
         try:
-            await self._run_command_async("sudo ip link set wlan0 down")
+            await self._exec("sudo", "ip", "link", "set", "wlan0", "down")
             await asyncio.sleep(1)
-            await self._run_command_async("sudo ip link set wlan0 up")
+            await self._exec("sudo", "ip", "link", "set", "wlan0", "up")
             await asyncio.sleep(1)
-            await self._run_command_async("sudo systemctl restart wpa_supplicant")
+            await self._exec("sudo", "systemctl", "restart", "wpa_supplicant")
             await asyncio.sleep(3)
-            await self._run_command_async("sudo dhclient wlan0", check=False)
+            await self._exec("sudo", "dhclient", "wlan0", check=False)
             await asyncio.sleep(3)
 
             self.state = APState.CLIENT_MODE
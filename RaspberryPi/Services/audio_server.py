@@ -6,19 +6,23 @@ Used during live streaming sessions when Pi is in AP mode.
 
 Endpoint: ws://192.168.4.1:8081
 Audio Format: 16-bit PCM, 16kHz, Mono
+
+The first message is an AUDC config header; every message after that is
+raw PCM. Message length varies (queued chunks may be merged), so clients
+must treat the audio as a continuous sample stream.
 """
 
 import asyncio
 import logging
 import struct
 import time
+from collections import deque
 from typing import Optional, Set
 from dataclasses import dataclass
 
 # Try importing audio libraries
 try:
     import sounddevice as sd
-    import numpy as np
     SOUNDDEVICE_AVAILABLE = True
 except ImportError:
     SOUNDDEVICE_AVAILABLE = False
@@ -27,12 +31,27 @@ except ImportError:
 # Try importing websockets
 try:
     import websockets
+    from websockets import broadcast as ws_broadcast
     from websockets.server import serve as ws_serve
     WEBSOCKETS_AVAILABLE = True
 except ImportError:
     WEBSOCKETS_AVAILABLE = False
     print("[Audio] Warning: websockets not available")
 
+# Low-level frame builder, used to serialize each audio frame once for all clients
+try:
+    from websockets.frames import Frame, Opcode
+    PREFRAME_AVAILABLE = True
+except ImportError:
+    PREFRAME_AVAILABLE = False
+
+# Faster event loop (libuv) if installed
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # Import settings
 import os
 import sys
@@ -41,6 +60,19 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Config message sent to each client on connect: magic, sample rate, channels, bit depth
+_AUDC_HEADER = struct.Struct('<4sIHH')
+
+# Captured chunks waiting for broadcast; older chunks are discarded beyond this
+# (4 x 64 ms = 256 ms worst-case added latency at 16 kHz / 1024 samples)
+_MAX_PENDING_FRAMES = 4
+
+# Upper bound when merging queued chunks into a single WebSocket message
+_MAX_MESSAGE_BYTES = 16384
+
+# Bytes queued in a client's transport before its audio frames are dropped
+_CLIENT_WRITE_LIMIT = 64 * 1024
+
 
 @dataclass
 class AudioConfig:
@@ -75,7 +107,13 @@ class AudioServer:
         self.is_running = False
         self._server = None
         self._audio_stream = None
-        self._audio_queue: asyncio.Queue = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Capture thread -> event loop hand-off: deque append/popleft are
+        # atomic, and the event is set via call_soon_threadsafe. When full,
+        # append() drops the oldest chunk so the stream stays live.
+        self._frames: deque = deque(maxlen=_MAX_PENDING_FRAMES)
+        self._wake: Optional[asyncio.Event] = None
 
         # Client tracking
         self._clients: Set = set()
@@ -87,6 +125,22 @@ class AudioServer:
         # Audio device
         self._device = None
 
+        # Packed once in start(), sent as-is to every client
+        self._config_bytes = b""
+
+        # Status dict, built once; get_status() refreshes the live fields
+        self._status = {
+            "is_running": False,
+            "port": self.port,
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "chunk_size": self.chunk_size,
+            "connected_clients": 0,
+            "chunks_streamed": 0,
+            "sounddevice_available": SOUNDDEVICE_AVAILABLE,
+            "websockets_available": WEBSOCKETS_AVAILABLE,
+        }
+
     def _find_i2s_device(self) -> Optional[int]:
         """Find the I2S microphone device index."""
         if not SOUNDDEVICE_AVAILABLE:
@@ -137,18 +191,28 @@ class AudioServer:
             # Find audio device
             self._device = self._find_i2s_device()
 
-            # Create audio queue for thread-safe communication
-            self._audio_queue = asyncio.Queue(maxsize=50)
+            self._config_bytes = _AUDC_HEADER.pack(b'AUDC', self.sample_rate, self.channels, 16)
+
+            # Loop and wake-up event for the capture thread hand-off
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._frames.clear()
 
             # Start audio capture
             if not await self._start_audio_capture():
                 return False
 
             # Start WebSocket server
+            # No permessage-deflate: PCM barely compresses, and plain frames
+            # let every client share one pre-serialized frame
             self._server = await ws_serve(
                 self._handle_client,
                 '0.0.0.0',
-                self.port
+                self.port,
+                compression=None,
+                max_size=2**16,         # Clients only send small control messages
+                ping_interval=20,
+                ping_timeout=10,
             )
 
             self.is_running = True
@@ -170,25 +234,39 @@ class AudioServer:
     async def _start_audio_capture(self) -> bool:
         """Start capturing audio from microphone."""
         try:
+            # PortAudio reuses its input buffer, so each block is copied into
+            # a ring of bytearrays one slot larger than the pending-frame
+            # deque (+1 for the chunk being broadcast); a slot is never
+            # overwritten while a memoryview of it is still queued.
+            ring = [bytearray(self.chunk_size * self.channels * 2)
+                    for _ in range(_MAX_PENDING_FRAMES + 2)]
+            ring_mv = [memoryview(buf) for buf in ring]
+            ring_idx = 0
+
             def audio_callback(indata, frames, time_info, status):
-                """Called by sounddevice for each audio chunk."""
-                if status:
-                    logger.warning(f"Audio status: {status}")
-
-                if self.is_running and self._audio_queue:
-                    try:
-                        # Convert to 16-bit PCM
-                        audio_data = (indata * 32767).astype(np.int16)
-                        # Put in queue (non-blocking)
-                        self._audio_queue.put_nowait(audio_data.tobytes())
-                    except asyncio.QueueFull:
-                        pass  # Drop frame if queue is full
-
-            # Open audio stream
-            self._audio_stream = sd.InputStream(
+                """Called by sounddevice for each block of 16-bit PCM."""
+                if status and logger.isEnabledFor(logging.WARNING):
+                    logger.warning("Audio status: %s", status)
+
+                nonlocal ring_idx
+
+                if self.is_running:
+                    # Copy the raw int16 block into the next ring slot
+                    nbytes = frames * self.channels * 2
+                    slot = ring_mv[ring_idx][:nbytes]
+                    slot[:] = indata
+                    # Hand off to the event loop as a view (no further copy)
+                    self._frames.append(slot)
+                    ring_idx = (ring_idx + 1) % len(ring)
+                    if not self._wake.is_set():
+                        self._loop.call_soon_threadsafe(self._wake.set)
+
+            # Open audio stream: PortAudio delivers int16 directly, so there
+            # is no float -> PCM conversion in Python at all
+            self._audio_stream = sd.RawInputStream(
                 samplerate=self.sample_rate,
                 channels=self.channels,
-                dtype='float32',
+                dtype='int16',
                 blocksize=self.chunk_size,
                 device=self._device,
                 callback=audio_callback
@@ -207,6 +285,10 @@ class AudioServer:
         logger.info("Stopping audio server...")
         self.is_running = False
 
+        # Wake the broadcast loop so it sees is_running and exits
+        if self._wake:
+            self._wake.set()
+
         # Stop audio capture
         if self._audio_stream:
             try:
@@ -230,13 +312,8 @@ class AudioServer:
             await self._server.wait_closed()
             self._server = None
 
-        # Clear queue
-        if self._audio_queue:
-            while not self._audio_queue.empty():
-                try:
-                    self._audio_queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    break
+        # Clear pending frames
+        self._frames.clear()
 
         logger.info("Audio server stopped")
 
@@ -249,14 +326,7 @@ class AudioServer:
 
         try:
             # Send audio configuration header
-            config_msg = struct.pack(
-                '<4sIHH',
-                b'AUDC',  # Magic header
-                self.sample_rate,
-                self.channels,
-                16  # Bit depth
-            )
-            await websocket.send(config_msg)
+            await websocket.send(self._config_bytes)
 
             # Keep connection alive until closed
             async for message in websocket:
@@ -276,32 +346,31 @@ class AudioServer:
 
         while self.is_running:
             try:
-                # Get audio chunk from queue
-                audio_data = await asyncio.wait_for(
-                    self._audio_queue.get(),
-                    timeout=1.0
-                )
+                # Wait for the capture thread to hand over audio
+                # (stop() sets the event too, so no timeout is needed)
+                await self._wake.wait()
+                self._wake.clear()
+
+                frames = self._frames
+                while frames:
+                    if not self._clients:
+                        frames.clear()
+                        break
+
+                    # Merge any backlog into one message (PCM after the AUDC
+                    # header is a plain sample stream, so boundaries don't matter)
+                    audio_data = frames.popleft()
+                    if frames:
+                        parts = [audio_data]
+                        size = len(audio_data)
+                        while frames and size < _MAX_MESSAGE_BYTES:
+                            part = frames.popleft()
+                            parts.append(part)
+                            size += len(part)
+                        audio_data = b"".join(parts)
+
+                    self._send_to_clients(audio_data)
 
-                if not self._clients:
-                    continue
-
-                # Broadcast to all clients
-                disconnected = set()
-                for client in self._clients:
-                    try:
-                        await client.send(audio_data)
-                        self.chunks_streamed += 1
-                    except websockets.exceptions.ConnectionClosed:
-                        disconnected.add(client)
-                    except Exception as e:
-                        logger.error(f"Broadcast error: {e}")
-                        disconnected.add(client)
-
-                # Remove disconnected clients
-                self._clients -= disconnected
-
-            except asyncio.TimeoutError:
-                continue
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -310,24 +379,57 @@ class AudioServer:
 
         logger.info("Audio broadcast loop stopped")
 
+    def _send_to_clients(self, audio_data: bytes):
+        """
+        Write one audio frame to every connected client without awaiting.
+
+        The WebSocket frame is serialized once and the same bytes are
+        written to each client's transport. Clients that negotiated an
+        extension go through websockets.broadcast() instead. A client
+        whose transport is backed up skips the frame: stale audio is
+        worth nothing.
+
+        Connections that are closing are skipped; _handle_client removes
+        them from _clients when its connection ends.
+        """
+        fallback = []
+        blob = None
+
+        for client in self._clients:
+            if not client.open:
+                continue
+            elif not PREFRAME_AVAILABLE or client.extensions:
+                fallback.append(client)
+            else:
+                transport = client.transport
+                if transport.get_write_buffer_size() > _CLIENT_WRITE_LIMIT:
+                    continue
+                if blob is None:
+                    blob = Frame(Opcode.BINARY, audio_data).serialize(mask=False, extensions=[])
+                transport.write(blob)
+                self.chunks_streamed += 1
+
+        if fallback:
+            ws_broadcast(fallback, audio_data)
+            self.chunks_streamed += len(fallback)
+
     @property
     def client_count(self) -> int:
         """Get number of connected clients."""
         return len(self._clients)
 
     def get_status(self) -> dict:
-        """Get server status."""
-        return {
-            "is_running": self.is_running,
-            "port": self.port,
-            "sample_rate": self.sample_rate,
-            "channels": self.channels,
-            "chunk_size": self.chunk_size,
-            "connected_clients": len(self._clients),
-            "chunks_streamed": self.chunks_streamed,
-            "sounddevice_available": SOUNDDEVICE_AVAILABLE,
-            "websockets_available": WEBSOCKETS_AVAILABLE,
-        }
+        """
+        Get server status.
+
+        Returns the same dict on every call with its live fields updated;
+        copy it if you need a snapshot.
+        """
+        status = self._status
+        status["is_running"] = self.is_running
+        status["connected_clients"] = len(self._clients)
+        status["chunks_streamed"] = self.chunks_streamed
+        return status
 
 
 class DummyAudioServer:
@@ -412,4 +514,6 @@ if __name__ == "__main__":
         finally:
             await server.stop()
 
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(test_audio())
@@ -11,22 +11,92 @@ acts as a peripheral for mobile app communication. Both can run concurrently.
 """
 
 import asyncio
-from typing import Callable, Optional, List
+import importlib.util
+import logging
+import logging.handlers
+import queue
+from typing import Callable, Optional, List, TYPE_CHECKING
 from dataclasses import dataclass
 from enum import Enum
 from collections import deque
-import time
+from bisect import bisect_left
+import math
+import socket
 import statistics
+import struct
+import sys
+import time
 
-# Try to import bleak for BLE scanning
-try:
-    from bleak import BleakScanner
+# bleak is only imported when the first scanner starts (see BeaconBus.register)
+BLEAK_AVAILABLE = importlib.util.find_spec("bleak") is not None
+if not BLEAK_AVAILABLE:
+    print("[BLE Beacon] Warning: 'bleak' library not installed. Run: pip install bleak")
+
+if TYPE_CHECKING:
     from bleak.backends.device import BLEDevice
     from bleak.backends.scanner import AdvertisementData
-    BLEAK_AVAILABLE = True
+
+# Faster event loop (libuv) if installed
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
 except ImportError:
-    BLEAK_AVAILABLE = False
-    print("[BLE Beacon] Warning: 'bleak' library not installed. Run: pip install bleak")
+    UVLOOP_AVAILABLE = False
+
+
+# Path loss exponent (n) - typically 2-4 for indoor environments
+# Lower = less obstruction, Higher = more walls/obstacles
+_PATH_LOSS_EXPONENT = 2.5
+
+# RSSI range covered by the distance lookup table (dBm)
+_RSSI_MIN = -127
+_RSSI_MAX = 0
+
+# RSSI outlier filtering: median window, z-score gate and Kalman noise terms
+_MEDIAN_WINDOW = 5
+_OUTLIER_Z = 3.0            # Reject readings further than this many sigma from the estimate
+_OUTLIER_MIN_SAMPLES = 10   # Residuals needed before the gate is trusted
+_OUTLIER_MAX_REJECTS = 5    # Consecutive rejects accepted as a real level change
+_KALMAN_Q = 0.5             # Process noise (dB^2 per reading)
+_KALMAN_R = 4.0             # Measurement noise (dB^2, after the median)
+
+# Extra margin (dB) the RSSI must cross past a threshold to leave the current zone
+_ZONE_HYSTERESIS_DB = 3.0
+
+# Seconds a debounced zone change must persist before it is reported
+_ZONE_MIN_DWELL = 2.0
+
+# Seconds between checks for a beacon that has stopped advertising
+_NO_DETECTION_TICK = 1.0
+
+# Seconds between drains of queued advertisements
+_FLUSH_INTERVAL = 0.1
+
+# Advertisements queued between drains (all devices, not just the beacon)
+_ADV_QUEUE_SIZE = 256
+
+# Seconds main() waits for a status change before printing anyway
+_STATUS_WATCHDOG = 30.0
+
+# Raw HCI scanning (Linux): packet types, LE events and commands from the
+# Bluetooth Core spec. Bypasses bleak/D-Bus for each advertisement.
+_RAW_HCI_SUPPORTED = sys.platform.startswith("linux") and hasattr(socket, "AF_BLUETOOTH")
+_HCI_COMMAND_PKT = 0x01
+_HCI_EVENT_PKT = 0x04
+_EVT_CMD_COMPLETE = 0x0E
+_EVT_CMD_STATUS = 0x0F
+_EVT_LE_META_EVENT = 0x3E
+_EVT_LE_ADVERTISING_REPORT = 0x02
+_OP_LE_SET_SCAN_PARAMETERS = 0x200B  # OGF 0x08, OCF 0x000B
+_OP_LE_SET_SCAN_ENABLE = 0x200C      # OGF 0x08, OCF 0x000C
+_HCI_CMD_HEADER = struct.Struct("<BHB")        # packet type, opcode, parameter length
+_SCAN_PARAMS = struct.Struct("<BHHBB")         # active, interval, window, own addr type, policy
+_ADV_REPORT_HEADER = struct.Struct("<BB6sB")   # event type, addr type, address, data length
+_AD_LOCAL_NAMES = (0x08, 0x09)                 # Shortened / complete local name
+_HCI_CMD_TIMEOUT = 1.0                         # Seconds to wait for Command Complete/Status
+
+# Minimum seconds between per-detection status lines
+_STATUS_PRINT_INTERVAL = 1.0
 
 
 # ======================
@@ -63,18 +133,27 @@ class BeaconConfig:
     rssi_far: int = -110        # -105 to -110 dBm = FAR (25-35m)
                                 # Weaker than -110 dBm = OUT_OF_RANGE (> 35m)
 
-    # Scanning parameters (optimized for catching intermittent beacons)
+    # Scanning parameters (unused by the continuous scanner; kept for config compatibility)
     scan_interval: float = 0.1          # Seconds between scans (minimal gap for fast cycles)
     scan_duration: float = 3.0          # Duration of each scan (balanced coverage)
 
     # RSSI smoothing (reduces noise)
-    rssi_samples: int = 8               # Number of samples to average (good smoothing)
+    rssi_samples: int = 8               # Smoothing span in samples (c = 2 / (N + 1); N=19 gives c=0.1)
 
     # Lost device detection (tolerant of missed scans)
     lost_timeout: float = 25.0          # Seconds before marking as OUT_OF_RANGE
 
     # Zone change debounce (prevents rapid zone flickering)
-    zone_change_threshold: int = 3      # Consecutive readings needed to change zone (balanced)
+    zone_change_threshold: int = 3      # Consecutive batches (100ms flushes) needed to change zone
+
+    # Advertised service UUID to pre-filter on in BlueZ (None = every advertisement).
+    # The stock ESP32 beacon advertises only its name, so this stays unset for it.
+    service_uuid: Optional[str] = None
+
+    # Scan on a raw HCI socket instead of through bleak/BlueZ (Linux, needs CAP_NET_RAW).
+    # Off by default: it drives the controller behind bluetoothd, which also owns
+    # advertising for the app-facing GATT service on the same adapter.
+    raw_hci_scan: bool = False
 
 
 # ======================
@@ -107,6 +186,319 @@ class BeaconData:
         }
 
 
+# ======================
+# Shared Scanner
+# ======================
+
+def _adv_rssi(device: 'BLEDevice', adv_data: 'AdvertisementData') -> int:
+    """RSSI of an advertisement (AdvertisementData on newer bleak, BLEDevice on older)."""
+    if adv_data and getattr(adv_data, 'rssi', None) is not None:
+        return adv_data.rssi
+    if getattr(device, 'rssi', None) is not None:
+        return device.rssi
+    return -100
+
+
+class _RawDevice:
+    """Minimal BLEDevice stand-in for advertisements from _LinuxRawScanner."""
+    __slots__ = ("address", "name")
+
+    def __init__(self, address: str, name: Optional[str]):
+        self.address = address
+        self.name = name
+
+
+class _RawAdvertisement:
+    """Minimal AdvertisementData stand-in for _LinuxRawScanner."""
+    __slots__ = ("local_name", "rssi")
+
+    def __init__(self, local_name: Optional[str], rssi: int):
+        self.local_name = local_name
+        self.rssi = rssi
+
+
+class _LinuxRawScanner:
+    """
+    LE scanner on a raw HCI socket, bypassing BlueZ's D-Bus API.
+
+    Drop-in for BleakScanner as used by BeaconBus: same detection_callback
+    signature and async start()/stop(). Needs CAP_NET_RAW; start() raises
+    OSError without it, or if the controller rejects a scan command, so the
+    caller can fall back to bleak. Scanning is
+    active (so scan responses carrying the name are received) with
+    duplicate filtering off (so every advertisement reports an RSSI).
+    """
+
+    def __init__(self, detection_callback: Callable, dev_id: int = 0):
+        self._callback = detection_callback
+        self._dev_id = dev_id
+        self._sock: Optional[socket.socket] = None
+        self._names: dict = {}  # address -> last advertised local name
+
+    async def start(self):
+        sock = socket.socket(socket.AF_BLUETOOTH, socket.SOCK_RAW, socket.BTPROTO_HCI)
+        try:
+            sock.bind((self._dev_id,))
+            # Deliver command replies and LE meta events to this socket
+            type_mask = 1 << _HCI_EVENT_PKT
+            event_mask_lo = (1 << _EVT_CMD_COMPLETE) | (1 << _EVT_CMD_STATUS)
+            event_mask_hi = 1 << (_EVT_LE_META_EVENT - 32)
+            sock.setsockopt(socket.SOL_HCI, socket.HCI_FILTER,
+                            struct.pack("<IIIH", type_mask, event_mask_lo, event_mask_hi, 0))
+            sock.setblocking(False)
+            # Disabling fails with Command Disallowed if not scanning; that's fine
+            await self._run_command(sock, _OP_LE_SET_SCAN_ENABLE, bytes((0, 0)))
+            # Active scan, 10 ms interval and window (units of 0.625 ms)
+            await self._run_command(sock, _OP_LE_SET_SCAN_PARAMETERS,
+                                    _SCAN_PARAMS.pack(1, 0x10, 0x10, 0, 0), check=True)
+            await self._run_command(sock, _OP_LE_SET_SCAN_ENABLE, bytes((1, 0)), check=True)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable)
+
+    async def stop(self):
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(sock.fileno())
+        try:
+            self._send_command(sock, _OP_LE_SET_SCAN_ENABLE, bytes((0, 0)))
+        except OSError:
+            pass
+        sock.close()
+
+    @staticmethod
+    def _send_command(sock: socket.socket, opcode: int, params: bytes):
+        sock.send(_HCI_CMD_HEADER.pack(_HCI_COMMAND_PKT, opcode, len(params)) + params)
+
+    async def _run_command(self, sock: socket.socket, opcode: int, params: bytes,
+                           check: bool = False) -> int:
+        """Send a command and return the status from its Command Complete/Status event."""
+        loop = asyncio.get_running_loop()
+        self._send_command(sock, opcode, params)
+        deadline = loop.time() + _HCI_CMD_TIMEOUT
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise OSError(f"no reply to HCI command 0x{opcode:04X}")
+            try:
+                pkt = await asyncio.wait_for(loop.sock_recv(sock, 260), remaining)
+            except asyncio.TimeoutError:
+                raise OSError(f"no reply to HCI command 0x{opcode:04X}") from None
+            if len(pkt) < 7 or pkt[0] != _HCI_EVENT_PKT:
+                continue
+            # [04 0E len ncmd opcode(2) status ...] / [04 0F len status ncmd opcode(2)]
+            if pkt[1] == _EVT_CMD_COMPLETE and struct.unpack_from("<H", pkt, 4)[0] == opcode:
+                status = pkt[6]
+            elif pkt[1] == _EVT_CMD_STATUS and struct.unpack_from("<H", pkt, 5)[0] == opcode:
+                status = pkt[3]
+            else:
+                continue
+            if check and status:
+                raise OSError(f"HCI command 0x{opcode:04X} failed with status 0x{status:02X}")
+            return status
+
+    def _on_readable(self):
+        sock = self._sock
+        while sock is not None:
+            try:
+                pkt = sock.recv(260)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                print(f"[BLE Beacon] HCI socket error: {e}")
+                return
+            if (len(pkt) > 4 and pkt[0] == _HCI_EVENT_PKT
+                    and pkt[1] == _EVT_LE_META_EVENT and pkt[3] == _EVT_LE_ADVERTISING_REPORT):
+                self._parse_reports(pkt)
+
+    def _parse_reports(self, pkt: bytes):
+        """Parse an LE Advertising Report event: [04 3E len 02 num_reports reports...]."""
+        num_reports = pkt[4]
+        off = 5
+        end = len(pkt)
+        for _ in range(num_reports):
+            if off + _ADV_REPORT_HEADER.size > end:
+                return
+            _, _, raw_addr, data_len = _ADV_REPORT_HEADER.unpack_from(pkt, off)
+            off += _ADV_REPORT_HEADER.size
+            if off + data_len + 1 > end:
+                return
+            data = pkt[off:off + data_len]
+            rssi = pkt[off + data_len]
+            off += data_len + 1
+            if rssi > 127:
+                rssi -= 256
+
+            address = ":".join(f"{b:02X}" for b in reversed(raw_addr))
+            name = self._local_name(data)
+            if name:
+                self._names[address] = name
+            else:
+                name = self._names.get(address)
+            self._callback(_RawDevice(address, name), _RawAdvertisement(name, rssi))
+
+    @staticmethod
+    def _local_name(data: bytes) -> Optional[str]:
+        """Local name from advertising data structures, if present."""
+        i = 0
+        n = len(data)
+        while i + 1 < n:
+            length = data[i]
+            if length == 0:
+                break
+            if data[i + 1] in _AD_LOCAL_NAMES:
+                return data[i + 2:i + 1 + length].decode("utf-8", "replace")
+            i += 1 + length
+        return None
+
+
+class BeaconBus:
+    """
+    One BleakScanner shared by every BLEBeaconService in the process.
+
+    The scanner starts with the first registered listener and stops with
+    the last. The scanner callback only queues advertisements; every
+    _FLUSH_INTERVAL the queue is drained and coalesced per address, and
+    each listener is called once per address with all RSSI readings
+    received since the previous drain. Listeners apply their own target
+    filter, so tracking several beacons costs a single BlueZ discovery
+    session. Listeners may also name service UUIDs; when all of them do,
+    the scanner passes their union to BlueZ so other devices are dropped
+    before they reach Python.
+    """
+
+    _scanner = None
+    _scan_uuids: Optional[List[str]] = None
+    _listeners: List[Callable] = []
+    _listener_uuids: dict = {}
+    _listener_raw: dict = {}
+    _lock: Optional[asyncio.Lock] = None
+    _pending: deque = deque(maxlen=_ADV_QUEUE_SIZE)
+    _drain_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def _get_lock(cls) -> asyncio.Lock:
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        return cls._lock
+
+    @classmethod
+    def _on_advertisement(cls, device: 'BLEDevice', adv_data: 'AdvertisementData'):
+        """Scanner callback: queue only, the drain loop does the work."""
+        cls._pending.append((device, adv_data))
+
+    @classmethod
+    def _drain(cls):
+        """Coalesce queued advertisements per address and hand them to listeners."""
+        pending = cls._pending
+        batch = {}
+        while pending:
+            device, adv_data = pending.popleft()
+            rssi = _adv_rssi(device, adv_data)
+            entry = batch.get(device.address)
+            if entry is None:
+                batch[device.address] = [device, adv_data, [rssi]]
+            else:
+                entry[0] = device
+                entry[1] = adv_data
+                entry[2].append(rssi)
+
+        for device, adv_data, rssi_values in batch.values():
+            for listener in cls._listeners:
+                listener(device, adv_data, rssi_values)
+
+    @classmethod
+    async def _drain_loop(cls):
+        while True:
+            await asyncio.sleep(_FLUSH_INTERVAL)
+            if cls._pending:
+                try:
+                    cls._drain()
+                except Exception as e:
+                    print(f"[BLE Beacon] Dispatch error: {e}")
+
+    @classmethod
+    def _wanted_uuids(cls) -> Optional[List[str]]:
+        """Union of listener UUID filters, or None if any listener wants everything."""
+        wanted = set()
+        for uuids in cls._listener_uuids.values():
+            if uuids is None:
+                return None
+            wanted.update(uuids)
+        return sorted(wanted)
+
+    @classmethod
+    async def _start_scanner(cls):
+        uuids = cls._wanted_uuids()
+        # Raw HCI only when every listener opted in; it has no BlueZ-side UUID
+        # filter, so only unfiltered
+        raw_ok = bool(cls._listener_raw) and all(cls._listener_raw.values())
+        if _RAW_HCI_SUPPORTED and raw_ok and not uuids:
+            scanner = _LinuxRawScanner(cls._on_advertisement)
+            try:
+                await scanner.start()
+                cls._scanner = scanner
+                cls._scan_uuids = uuids
+                print("[BLE Beacon] Using raw HCI scanner")
+                return
+            except OSError as e:
+                print(f"[BLE Beacon] Raw HCI scanner unavailable ({e}), using bleak")
+
+        from bleak import BleakScanner
+        if uuids:
+            scanner = BleakScanner(detection_callback=cls._on_advertisement, service_uuids=uuids)
+        else:
+            scanner = BleakScanner(detection_callback=cls._on_advertisement)
+        await scanner.start()
+        cls._scanner = scanner
+        cls._scan_uuids = uuids
+
+    @classmethod
+    async def register(cls, callback: Callable, service_uuids: Optional[List[str]] = None,
+                       raw_hci: bool = False):
+        """
+        Add a listener, starting the shared scanner if it isn't running.
+
+        callback(device, adv_data, rssi_values) is called once per address
+        per drain. service_uuids limits what this listener needs to see;
+        the scanner is restarted if that changes the combined filter.
+        raw_hci allows the raw HCI backend; it is used only if every
+        listener allows it when the scanner starts.
+        """
+        async with cls._get_lock():
+            cls._listener_uuids[callback] = tuple(service_uuids) if service_uuids else None
+            cls._listener_raw[callback] = raw_hci
+            if cls._scanner is None:
+                await cls._start_scanner()
+                cls._drain_task = asyncio.create_task(cls._drain_loop())
+                print("[BLE Beacon] Shared scanner started")
+            elif cls._wanted_uuids() != cls._scan_uuids:
+                await cls._scanner.stop()
+                await cls._start_scanner()
+            cls._listeners = cls._listeners + [callback]
+
+    @classmethod
+    async def unregister(cls, callback: Callable):
+        """Remove a listener, stopping the shared scanner after the last one."""
+        async with cls._get_lock():
+            cls._listeners = [cb for cb in cls._listeners if cb != callback]
+            cls._listener_uuids.pop(callback, None)
+            cls._listener_raw.pop(callback, None)
+            if not cls._listeners and cls._scanner is not None:
+                scanner, cls._scanner = cls._scanner, None
+                cls._drain_task.cancel()
+                cls._drain_task = None
+                cls._pending.clear()
+                await scanner.stop()
+                print("[BLE Beacon] Shared scanner stopped")
+            elif cls._scanner is not None and cls._wanted_uuids() != cls._scan_uuids:
+                await cls._scanner.stop()
+                await cls._start_scanner()
+
+
 # ======================
 # BLE Beacon Service
 # ======================
@@ -129,10 +521,43 @@ class BLEBeaconService:
         """Initialize the beacon service."""
         self.config = config or BeaconConfig()
         self._beacon_data = BeaconData()
-        self._rssi_history: deque = deque(maxlen=self.config.rssi_samples)
-        self._zone_counter: dict = {zone: 0 for zone in ProximityZone}
+        # Single-state ARMA smoothing n_t = n_{t-1} - c*(n_{t-1} - rssi),
+        # same span as an N-sample average
+        self._arma_c = 2.0 / (self.config.rssi_samples + 1)
+        self._arma_rssi: Optional[float] = None
+        # Outlier-robust cascade: median prefilter -> z-score gate -> scalar Kalman
+        self._median_buf: deque = deque(maxlen=_MEDIAN_WINDOW)
+        self._resid_n = 0       # Welford running stats of (rssi - ARMA estimate)
+        self._resid_mean = 0.0
+        self._resid_m2 = 0.0
+        self._rejects = 0
+        self._kalman_x: Optional[float] = None
+        self._kalman_p = _KALMAN_R
+
+        # Distance model constants: distance = e^(ln10 / (10 * n) * (tx - rssi))
+        self._ln10_over_10n = math.log(10.0) / (10.0 * _PATH_LOSS_EXPONENT)
+        self._tx = self.config.tx_power_at_1m
+        self._dist_lut: List[float] = []
+        self._build_distance_lut()
+        # Zone lookup: bisect_left counts thresholds strictly below the RSSI,
+        # which indexes straight into the zones ordered weakest to strongest
+        self._thresholds = (self.config.rssi_far, self.config.rssi_medium, self.config.rssi_near)
+        self._zones = (ProximityZone.OUT_OF_RANGE, ProximityZone.FAR,
+                       ProximityZone.MEDIUM, ProximityZone.NEAR)
+        self._zone_index = {zone: i for i, zone in enumerate(self._zones)}
+        # Debounce state: the zone seen in the latest run of readings and its length
+        self._candidate_zone = ProximityZone.UNKNOWN
+        self._candidate_count = 0
+        # Dwell timer: the confirmed zone waiting to be reported
+        self._pending_zone: Optional[ProximityZone] = None
+        self._pending_zone_handle: Optional[asyncio.TimerHandle] = None
         self._is_running = False
         self._scan_task: Optional[asyncio.Task] = None
+        self._target_addr: Optional[str] = None  # ESP32 address, learned on first name match
+        self._last_status_print = 0.0
+        # Set when the zone, whole-metre distance or detection state changes
+        self._status_changed = asyncio.Event()
+        self._last_status_key = None
 
         # Callbacks
         self._on_zone_change: Optional[Callable[[ProximityZone, ProximityZone], None]] = None
@@ -182,7 +607,7 @@ class BLEBeaconService:
 
     async def start(self) -> bool:
         """Start the beacon scanning service."""
-        if not BLEAK_AVAILABLE:
+        if not BLEAK_AVAILABLE and not (_RAW_HCI_SUPPORTED and self.config.raw_hci_scan):
             print("[BLE Beacon] Cannot start - 'bleak' library not available")
             return False
 
@@ -196,8 +621,17 @@ class BLEBeaconService:
               f"MEDIUM: {self.config.rssi_near} to {self.config.rssi_medium}, "
               f"FAR: {self.config.rssi_medium} to {self.config.rssi_far}")
 
+        # Long-lived shared scanner; advertisements are delivered to the callback
+        try:
+            uuids = [self.config.service_uuid] if self.config.service_uuid else None
+            await BeaconBus.register(self._on_advertisements, uuids,
+                                     raw_hci=self.config.raw_hci_scan)
+        except Exception as e:
+            print(f"[BLE Beacon] Failed to start scanner: {e}")
+            return False
+
         self._is_running = True
-        self._scan_task = asyncio.create_task(self._scan_loop())
+        self._scan_task = asyncio.create_task(self._lost_check_loop())
 
         print("[BLE Beacon] Scanner started")
         return True
@@ -208,6 +642,7 @@ class BLEBeaconService:
             return
 
         self._is_running = False
+        self._cancel_pending_zone()
 
         if self._scan_task:
             self._scan_task.cancel()
@@ -217,12 +652,38 @@ class BLEBeaconService:
                 pass
             self._scan_task = None
 
+        try:
+            await BeaconBus.unregister(self._on_advertisements)
+        except Exception as e:
+            print(f"[BLE Beacon] Error stopping scanner: {e}")
+
         print("[BLE Beacon] Scanner stopped")
 
     def get_beacon_data(self) -> BeaconData:
         """Get current beacon data."""
         return self._beacon_data
 
+    async def wait_for_status_change(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the zone, distance (whole metres) or detection state changes.
+
+        Returns False if the timeout expired first.
+        """
+        try:
+            await asyncio.wait_for(self._status_changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._status_changed.clear()
+        return True
+
+    def _mark_status(self):
+        """Set the status event if the reported state actually changed."""
+        data = self._beacon_data
+        key = (data.detected, data.zone, int(data.distance_meters))
+        if key != self._last_status_key:
+            self._last_status_key = key
+            self._status_changed.set()
+
     def get_zone(self) -> ProximityZone:
         """Get current proximity zone."""
         return self._beacon_data.zone
@@ -245,12 +706,20 @@ class BLEBeaconService:
         3. Call this method with that value
         """
         self.config.tx_power_at_1m = rssi_at_1m
+        self._tx = rssi_at_1m
+        self._build_distance_lut()
         print(f"[BLE Beacon] TX Power calibrated to {rssi_at_1m} dBm at 1 meter")
 
     # ======================
     # Distance Calculation
     # ======================
 
+    def _build_distance_lut(self):
+        """Tabulate the path loss model for every whole dBm in range."""
+        k, tx = self._ln10_over_10n, self._tx
+        # One spare entry so interpolation at _RSSI_MAX can read [i + 1]
+        self._dist_lut = [math.exp(k * (tx - r)) for r in range(_RSSI_MIN, _RSSI_MAX + 2)]
+
     def _rssi_to_distance(self, rssi: float) -> float:
         """
         Estimate distance from RSSI using log-distance path loss model.
@@ -266,31 +735,89 @@ class BLEBeaconService:
         if rssi == 0:
             return -1.0
 
-        # Path loss exponent (n) - typically 2-4 for indoor environments
-        # Lower = less obstruction, Higher = more walls/obstacles
-        n = 2.5
-
         # Log-distance path loss model
-        # distance = 10 ^ ((TxPower - RSSI) / (10 * n))
-        ratio = (self.config.tx_power_at_1m - rssi) / (10 * n)
-        distance = pow(10, ratio)
-
-        return distance
+        # distance = 10 ^ ((TxPower - RSSI) / (10 * n)), read from the table and
+        # linearly interpolated for the fractional RSSI the EMA produces
+        x = min(max(rssi, _RSSI_MIN), _RSSI_MAX) - _RSSI_MIN
+        i = int(x)
+        lo = self._dist_lut[i]
+        return lo + (self._dist_lut[i + 1] - lo) * (x - i)
 
     def _get_zone_from_rssi(self, rssi: float) -> ProximityZone:
-        """Determine proximity zone from RSSI value."""
-        if rssi > self.config.rssi_near:
-            return ProximityZone.NEAR
-        elif rssi > self.config.rssi_medium:
-            return ProximityZone.MEDIUM
-        elif rssi > self.config.rssi_far:
-            return ProximityZone.FAR
-        else:
-            return ProximityZone.OUT_OF_RANGE
+        """
+        Determine proximity zone from RSSI value.
 
-    def _smooth_rssi(self, rssi: int) -> float:
-        self._rssi_history.append(rssi)
-        return statistics.median(self._rssi_history)
+        Leaving the current zone takes _ZONE_HYSTERESIS_DB beyond the
+        threshold, so readings hovering on a boundary don't flap.
+        """
+        idx = bisect_left(self._thresholds, rssi)
+        cur = self._zone_index.get(self._beacon_data.zone)
+        if cur is not None:
+            if idx > cur:
+                idx = max(cur, bisect_left(self._thresholds, rssi - _ZONE_HYSTERESIS_DB))
+            elif idx < cur:
+                idx = min(cur, bisect_left(self._thresholds, rssi + _ZONE_HYSTERESIS_DB))
+        return self._zones[idx]
+
+    def _smooth_batch(self, rssi_values: List[int]) -> float:
+        """
+        Filter a batch of RSSI readings and return the smoothed estimate.
+
+        Each reading is checked against the ARMA estimate and dropped if it
+        is more than _OUTLIER_Z running standard deviations away (Welford).
+        Survivors go through a 5-sample median, and the median feeds a
+        scalar Kalman filter whose state is the returned estimate. The
+        first reading seeds both estimates so they converge immediately.
+        """
+        arma = self._arma_rssi
+        if arma is None:
+            arma = float(rssi_values[0])
+        x = self._kalman_x
+        if x is None:
+            x = float(rssi_values[0])
+        p = self._kalman_p
+        c = self._arma_c
+        buf = self._median_buf
+
+        for rssi in rssi_values:
+            # Welford update of the residual statistics
+            resid = rssi - arma
+            self._resid_n += 1
+            delta = resid - self._resid_mean
+            self._resid_mean += delta / self._resid_n
+            self._resid_m2 += delta * (resid - self._resid_mean)
+
+            # z-score gate; a long run of rejects is a genuine level change
+            if self._resid_n >= _OUTLIER_MIN_SAMPLES and self._rejects < _OUTLIER_MAX_REJECTS:
+                sigma = math.sqrt(self._resid_m2 / (self._resid_n - 1))
+                if abs(resid) > _OUTLIER_Z * sigma:
+                    self._rejects += 1
+                    continue
+            self._rejects = 0
+
+            arma -= c * (arma - rssi)
+            buf.append(rssi)
+
+            # Kalman update on the median of recent survivors
+            k = p / (p + _KALMAN_R)
+            x += k * (statistics.median(buf) - x)
+            p = (1.0 - k) * p + _KALMAN_Q
+
+        self._arma_rssi = arma
+        self._kalman_x = x
+        self._kalman_p = p
+        return x
+
+    def _reset_filters(self):
+        """Forget all RSSI filter state (beacon lost)."""
+        self._arma_rssi = None
+        self._median_buf.clear()
+        self._resid_n = 0
+        self._resid_mean = 0.0
+        self._resid_m2 = 0.0
+        self._rejects = 0
+        self._kalman_x = None
+        self._kalman_p = _KALMAN_R
 
     # ======================
     # Zone Change Detection
@@ -300,114 +827,117 @@ class BLEBeaconService:
         """
         Update zone with debouncing to prevent rapid flickering.
 
-        Requires multiple consecutive readings in the same zone
-        before changing the reported zone.
+        Requires multiple consecutive readings in the same zone, then a
+        further _ZONE_MIN_DWELL seconds without a contrary reading, before
+        changing the reported zone. The first zone after UNKNOWN is
+        reported as soon as it is confirmed.
         """
         old_zone = self._beacon_data.zone
+        threshold = self.config.zone_change_threshold
 
-        # Reset counter for other zones, increment for this zone
-        for zone in ProximityZone:
-            if zone == new_zone:
-                self._zone_counter[zone] = min(
-                    self._zone_counter[zone] + 1,
-                    self.config.zone_change_threshold + 1
-                )
-            else:
-                self._zone_counter[zone] = 0
+        # Extend the current run, or start a new one for a different zone
+        if new_zone is self._candidate_zone:
+            if self._candidate_count <= threshold:
+                self._candidate_count += 1
+        else:
+            self._candidate_zone = new_zone
+            self._candidate_count = 1
+            # Any contrary reading restarts the dwell
+            self._cancel_pending_zone()
+
+        if new_zone == old_zone or self._candidate_count < threshold:
+            return
 
-        # Check if we should change zone
-        if self._zone_counter[new_zone] >= self.config.zone_change_threshold:
-            if new_zone != old_zone:
-                self._beacon_data.zone = new_zone
-                print(f"[BLE Beacon] Zone changed: {old_zone.value} -> {new_zone.value}")
+        if old_zone == ProximityZone.UNKNOWN:
+            self._commit_zone(new_zone)
+        elif self._pending_zone is not new_zone:
+            self._pending_zone = new_zone
+            self._pending_zone_handle = asyncio.get_running_loop().call_later(
+                _ZONE_MIN_DWELL, self._commit_zone, new_zone)
+
+    def _cancel_pending_zone(self):
+        """Drop a zone change still waiting out its dwell time."""
+        if self._pending_zone_handle is not None:
+            self._pending_zone_handle.cancel()
+            self._pending_zone_handle = None
+        self._pending_zone = None
+
+    def _commit_zone(self, new_zone: ProximityZone):
+        """Report a zone change and fire the callback."""
+        self._pending_zone_handle = None
+        self._pending_zone = None
+        old_zone = self._beacon_data.zone
+        if new_zone == old_zone or not self._beacon_data.detected:
+            return
 
-                # Fire callback
-                if self._on_zone_change:
-                    try:
-                        self._on_zone_change(old_zone, new_zone)
-                    except Exception as e:
-                        print(f"[BLE Beacon] Zone change callback error: {e}")
+        self._beacon_data.zone = new_zone
+        print(f"[BLE Beacon] Zone changed: {old_zone.value} -> {new_zone.value}")
+        self._mark_status()
+
+        # Fire callback
+        if self._on_zone_change:
+            try:
+                self._on_zone_change(old_zone, new_zone)
+            except Exception as e:
+                print(f"[BLE Beacon] Zone change callback error: {e}")
 
     # ======================
     # Scanning
     # ======================
 
-    async def _scan_loop(self):
-        """
-        Main scanning loop.
+    def _on_advertisements(self, device: 'BLEDevice', adv_data: 'AdvertisementData',
+                           rssi_values: List[int]):
+        """BeaconBus listener: one call per address per drain, with every RSSI reading since the last."""
+        if self._is_target_device(device, adv_data):
+            try:
+                self._process_detection(device, rssi_values)
+            except Exception as e:
+                print(f"[BLE Beacon] Detection error: {e}")
 
-        Timing pattern:
-        - Scan for scan_duration (3s)
-        - Sleep for scan_interval (0.1s)
-        - Repeat (new scan every 3.1 seconds)
+    async def _lost_check_loop(self):
+        """
+        Check for a lost beacon once per tick.
 
-        This creates high scan coverage (3s scan / 3.1s total = 97% coverage)
-        with frequent scan starts to catch intermittent BLE advertisements
-        and reduce false "lost" detections.
+        Advertisements arrive through _on_advertisements as the shared
+        scanner receives them, so this loop only has to notice silence.
         """
         while self._is_running:
             try:
-                await self._perform_scan()
-                await asyncio.sleep(self.config.scan_interval)
+                await asyncio.sleep(_NO_DETECTION_TICK)
+                if time.time() - self._beacon_data.last_seen > _NO_DETECTION_TICK:
+                    self._handle_no_detection()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 print(f"[BLE Beacon] Scan error: {e}")
-                await asyncio.sleep(self.config.scan_interval)
-
-    async def _perform_scan(self):
-        """Perform a single BLE scan."""
-        esp32_found = False
-
-        try:
-            # Scan for devices
-            devices = await BleakScanner.discover(
-                timeout=self.config.scan_duration,
-                return_adv=True
-            )
-
-            # Look for our ESP32
-            for device, adv_data in devices.values():
-                if self._is_target_device(device, adv_data):
-                    esp32_found = True
-                    await self._process_detection(device, adv_data)
-                    break
-
-        except Exception as e:
-            import traceback
-            print(f"[BLE Beacon] Scan error: {e}")
-            traceback.print_exc()
-
-        # Handle lost device
-        if not esp32_found:
-            self._handle_no_detection()
 
     def _is_target_device(self, device, adv_data) -> bool:
         """
         Check if this advertisement belongs to our ESP32 beacon.
+
+        Once the beacon has been matched by name, its address is cached and
+        every other advertisement is rejected with one string compare.
         """
-        # 1. Match by device name
-        if adv_data and adv_data.local_name:
-            if self.config.device_name in adv_data.local_name:
-                return True
-        if device.name and self.config.device_name in device.name:
+        if self._target_addr is not None:
+            return device.address == self._target_addr
+
+        # Match by device name
+        name = self.config.device_name
+        if (adv_data and adv_data.local_name and name in adv_data.local_name) or \
+                (device.name and name in device.name):
+            self._target_addr = device.address
+            print(f"[BLE Beacon] Locked on to {device.address}")
             return True
 
         return False
 
-    async def _process_detection(self, device: 'BLEDevice', adv_data: 'AdvertisementData'):
-        """Process a detected ESP32 beacon."""
+    def _process_detection(self, device: 'BLEDevice', rssi_values: List[int]):
+        """Process the ESP32 beacon readings received since the last drain."""
         was_detected = self._beacon_data.detected
+        rssi = rssi_values[-1]
 
-        # Get RSSI from AdvertisementData (newer bleak versions)
-        rssi = -100
-        if adv_data and hasattr(adv_data, 'rssi') and adv_data.rssi is not None:
-            rssi = adv_data.rssi
-        elif hasattr(device, 'rssi') and device.rssi is not None:
-            rssi = device.rssi
-
-        # Smooth RSSI
-        rssi_smoothed = self._smooth_rssi(rssi)
+        # Smooth RSSI over the whole batch
+        rssi_smoothed = self._smooth_batch(rssi_values)
 
         # Calculate distance
         distance = self._rssi_to_distance(rssi_smoothed)
@@ -426,10 +956,14 @@ class BLEBeaconService:
 
         # Update zone with debouncing
         self._update_zone_with_debounce(new_zone)
+        self._mark_status()
 
-        # Print status
-        print(f"[BLE Beacon] {device.name} | RSSI: {rssi} dBm (avg: {rssi_smoothed:.1f}) | "
-              f"Distance: ~{distance:.1f}m | Zone: {self._beacon_data.zone.value}")
+        # Print status (at most once per interval; advertisements arrive much faster)
+        now = time.monotonic()
+        if now - self._last_status_print >= _STATUS_PRINT_INTERVAL:
+            self._last_status_print = now
+            print(f"[BLE Beacon] {device.name} | RSSI: {rssi} dBm (avg: {rssi_smoothed:.1f}) | "
+                  f"Distance: ~{distance:.1f}m | Zone: {self._beacon_data.zone.value}")
 
         # Fire callback if first detection
         if not was_detected and self._on_beacon_detected:
@@ -451,13 +985,16 @@ class BLEBeaconService:
 
             self._beacon_data.detected = False
             self._beacon_data.rssi = 0
-            self._rssi_history.clear()
+            self._reset_filters()
+            self._target_addr = None  # Fall back to name matching in case the address changed
 
             # Update zone
+            self._cancel_pending_zone()
             old_zone = self._beacon_data.zone
             self._beacon_data.zone = ProximityZone.OUT_OF_RANGE
 
             print(f"[BLE Beacon] Device lost - not seen for {time_since_seen:.1f}s")
+            self._mark_status()
 
             # Fire callbacks
             if was_detected and self._on_beacon_lost:
@@ -495,6 +1032,21 @@ def create_beacon_service(
 # Test / Standalone Run
 # ======================
 
+log = logging.getLogger("ble_beacon")
+
+
+def _start_queue_logging() -> logging.handlers.QueueListener:
+    """Route `log` through a queue so formatting and stdout writes happen
+    on the listener thread, not on the event loop running bleak callbacks."""
+    q: queue.Queue = queue.Queue(-1)
+    log.addHandler(logging.handlers.QueueHandler(q))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    listener = logging.handlers.QueueListener(q, logging.StreamHandler())
+    listener.start()
+    return listener
+
+
 async def main():
     """Test the beacon service."""
     print("=" * 60)
@@ -509,26 +1061,27 @@ async def main():
 
     # Create service with default config
     service = BLEBeaconService()
+    listener = _start_queue_logging()
 
     # Set up callbacks
     def on_zone_changed(old_zone: ProximityZone, new_zone: ProximityZone):
-        print(f"\n{'='*40}")
-        print(f"ZONE CHANGED: {old_zone.value} -> {new_zone.value}")
+        log.info("=" * 40)
+        log.info("ZONE CHANGED: %s -> %s", old_zone.value, new_zone.value)
         if new_zone == ProximityZone.OUT_OF_RANGE:
-            print("WARNING: Child is beyond 35m or not detected!")
+            log.info("WARNING: Child is beyond 35m or not detected!")
         elif new_zone == ProximityZone.FAR:
-            print("NOTICE: Child is 25-35m away")
+            log.info("NOTICE: Child is 25-35m away")
         elif new_zone == ProximityZone.MEDIUM:
-            print("INFO: Child is 15-25m away")
+            log.info("INFO: Child is 15-25m away")
         elif new_zone == ProximityZone.NEAR:
-            print("OK: Child is within 15m")
-        print(f"{'='*40}\n")
+            log.info("OK: Child is within 15m")
+        log.info("=" * 40)
 
     def on_beacon_detected(data: BeaconData):
-        print(f"\n[DETECTED] ESP32 found at {data.device_address}")
+        log.info("[DETECTED] ESP32 found at %s", data.device_address)
 
     def on_beacon_lost():
-        print(f"\n[LOST] ESP32 beacon lost - child may have left range!")
+        log.info("[LOST] ESP32 beacon lost - child may have left range!")
 
     service.on_zone_change = on_zone_changed
     service.on_beacon_detected = on_beacon_detected
@@ -547,22 +1100,24 @@ async def main():
 
     try:
         while True:
-            await asyncio.sleep(5)
+            # Print status when it changes (or after the watchdog interval)
+            await service.wait_for_status_change(_STATUS_WATCHDOG)
 
-            # Print current status periodically
             data = service.get_beacon_data()
             if data.detected:
-                print(f"[STATUS] Zone: {data.zone.value} | "
-                      f"Distance: ~{data.distance_meters:.1f}m | "
-                      f"RSSI: {data.rssi_smoothed:.1f} dBm")
+                log.info("[STATUS] Zone: %s | Distance: ~%.1fm | RSSI: %.1f dBm",
+                         data.zone.value, data.distance_meters, data.rssi_smoothed)
             else:
-                print(f"[STATUS] ESP32 not detected")
+                log.info("[STATUS] ESP32 not detected")
 
     except KeyboardInterrupt:
         print("\nStopping...")
     finally:
         await service.stop()
+        listener.stop()
 
 
 if __name__ == "__main__":
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
@@ -13,33 +13,123 @@ Allows mobile app to:
 """
 
 import asyncio
+import functools
+import importlib
 import json
-from typing import Optional
+import logging
+import struct
+import sys
+import time
+from dataclasses import dataclass, asdict, is_dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Fast JSON for characteristic payloads (falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional MessagePack wire format (see WIRE_FORMAT)
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+    _MP_ENC = msgspec.msgpack.Encoder()
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+def _dumps(obj) -> bytes:
+    """Serialize a payload to JSON bytes for a characteristic value."""
+    if ORJSON_AVAILABLE:
+        # Sound lists are keyed by int; stdlib json stringifies those too
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    if is_dataclass(obj):
+        obj = asdict(obj)
+    return json.dumps(obj).encode()
+
+
+def _wire_format() -> str:
+    """Format actually used for notify payloads (msgpack needs msgspec)."""
+    if WIRE_FORMAT == "msgpack" and MSGSPEC_AVAILABLE:
+        return "msgpack"
+    return "json"
+
+
+def _encode(obj) -> bytes:
+    """Serialize a sensor/behavior/status payload in the configured wire format."""
+    if WIRE_FORMAT == "msgpack" and MSGSPEC_AVAILABLE:
+        return _MP_ENC.encode(obj)
+    return _dumps(obj)
+
+
+_ts_cache = (0, "")
+
+
+def _now_ts() -> Union[str, int]:
+    """Current time as payload timestamp (see TIMESTAMP_FORMAT).
+
+    ISO strings are formatted at most once per millisecond.
+    """
+    global _ts_cache
+    now_ns = time.time_ns()
+    now_ms = now_ns // 1_000_000
+    if TIMESTAMP_FORMAT == "epoch_ms":
+        return now_ms
+    cached_ms, cached_str = _ts_cache
+    if now_ms != cached_ms:
+        cached_str = datetime.fromtimestamp(now_ns / 1e9).isoformat() + "Z"
+        _ts_cache = (now_ms, cached_str)
+    return cached_str
+
+
+def _loads(data: bytes):
+    """Parse JSON bytes written by the mobile app."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return json.loads(data.decode('utf-8'))
 
 # ======================
 # Patch dbus_next introspection bug (BlueZ 5.x compatibility)
 # ======================
-try:
-    import dbus_next.introspection as _intr
+_DBUS_PATCHED = False
+
+
+def _patch_dbus_next():
+    """Patch Arg.from_xml before the first introspection; no-op after that."""
+    global _DBUS_PATCHED
+    if _DBUS_PATCHED:
+        return
+    try:
+        import xml.etree.ElementTree as _ET
+        import dbus_next.introspection as _intr
+    except ImportError:
+        return  # dbus_next not installed yet
 
     _original_arg_from_xml = _intr.Arg.from_xml
 
+    @functools.lru_cache(maxsize=512)
+    def _cached_arg_from_xml(attrib_items, direction):
+        # The same <arg> elements repeat across every org.bluez.Device1
+        # introspection, so parse each distinct one only once
+        attrib = dict(attrib_items)
+        if not attrib.get('type'):
+            # Malformed introspection from BlueZ: no type attribute.
+            # Arg(signature, direction, name), defaulting to string
+            return _intr.Arg('s', direction, attrib.get('name'))
+        return _original_arg_from_xml(_ET.Element('arg', attrib), direction)
+
     @staticmethod
     def _patched_arg_from_xml(element, direction='in'):
-        try:
-            return _original_arg_from_xml(element, direction)
-        except _intr.InvalidIntrospectionError as e:
-            if 'type' in str(e):
-                # Return a proper Arg object for malformed introspection
-                # Arg(signature, direction, name)
-                name = element.attrib.get('name', None)
-                signature = element.attrib.get('type', 's')  # Default to string
-                return _intr.Arg(signature, direction, name)
-            raise
+        return _cached_arg_from_xml(tuple(sorted(element.attrib.items())), direction)
 
     _intr.Arg.from_xml = _patched_arg_from_xml
-except ImportError:
-    pass  # dbus_next not installed yet
+    _DBUS_PATCHED = True
+
 
 # Import bluez-peripheral for BLE GATT server
 try:
@@ -48,30 +138,43 @@ try:
     from bluez_peripheral.advert import Advertisement
     from bluez_peripheral.agent import NoIoAgent
     from bluez_peripheral.util import get_message_bus, Adapter
+    from dbus_next import Message, MessageType
     BLUEZ_AVAILABLE = True
 except ImportError as e:
     BLUEZ_AVAILABLE = False
-    print(f"[BLE] Warning: 'bluez-peripheral' not available: {e}")
-
-# Import distress service functions
-from services.distress_service import (
-    set_animation,
-    set_sound,
-    find_my_device,
-    enable_animation,
-    enable_sound,
-    get_settings,
-    get_full_settings,
-    stop_sound,
-    play_sound,
-    play_animation_now,
-    SOUNDS,
-    ANIMATIONS,
-    set_on_esp32_data_callback,
-    set_on_distress_callback,
-    set_child_profile_active,
-    is_child_profile_active,
-)
+    logger.warning("'bluez-peripheral' not available: %s", e)
+
+# Faster event loop (libuv) if installed
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+
+# distress_service drives the TFT and ESP32 link (board, PIL, sockets);
+# import it on the first command that needs it rather than at module load
+@functools.lru_cache(maxsize=None)
+def _load_distress():
+    """Return the services.distress_service module, importing it on first use."""
+    return importlib.import_module("services.distress_service")
+
+
+@functools.lru_cache(maxsize=None)
+def _static_settings_json() -> bytes:
+    """JSON members (no braces) that get_full_settings() adds to get_settings().
+
+    These are the available animation/sound lists built from the ANIMATIONS
+    and SOUNDS constants, so they are encoded once per process.
+    """
+    ds = _load_distress()
+    base = ds.get_settings()
+    extra = {k: v for k, v in ds.get_full_settings().items() if k not in base}
+    # Tells the app how to decode sensor/behavior/status payloads
+    extra["wireFormat"] = _wire_format()
+    extra["timestampFormat"] = TIMESTAMP_FORMAT
+    extra["notifyChunking"] = NOTIFY_CHUNKING
+    return _dumps(extra)[1:-1]
 
 
 # ======================
@@ -80,6 +183,46 @@ from services.distress_service import (
 
 BLE_DEVICE_NAME = "Calm Orb Hub"
 
+# Encoding of sensor/behavior/status payloads: "json" or "msgpack" (smaller,
+# fewer ATT fragments). The settings read stays JSON and reports the format
+# in use as "wireFormat", so the app can pick its decoder.
+WIRE_FORMAT = "json"
+
+# Sensor/behavior timestamps: "iso" (ISO-8601 string) or "epoch_ms" (integer
+# milliseconds since the epoch; shorter and skips date formatting). Reported
+# to the app as "timestampFormat" in the settings read.
+TIMESTAMP_FORMAT = "iso"
+
+# Split notifications longer than the smallest known ATT MTU allows into
+# chunks framed as [index, count] + data (see _send). Off by default: the
+# app must reassemble them. Reported as "notifyChunking" in the settings read.
+NOTIFY_CHUNKING = False
+
+# Command frame: opcode byte, parameter byte (missing parameter reads as 0)
+_CMD_HDR = struct.Struct('<BB')
+_ZERO_PAD = b'\x00'
+
+# Stream status sent when streaming cannot start (errorMessage filled per call)
+_STREAM_ERROR_STATUS = {
+    "state": 5,  # ERROR state
+    "stateName": "ERROR",
+    "errorMessage": "",
+    "apSSID": "",
+    "apPassword": "",
+    "videoUrl": "",
+    "audioUrl": "",
+    "videoClients": 0,
+    "audioClients": 0,
+    "startTime": 0,
+    "duration": 0,
+}
+
+# Sentinel for settings keys absent from a write (None is a valid value)
+_MISSING = object()
+
+# ATT header bytes in a Handle Value Notification (opcode + handle)
+ATT_NOTIFY_OVERHEAD = 3
+
 # Custom UUIDs for the service
 SERVICE_UUID = "12345678-1234-5678-1234-56789abcdef0"
 
@@ -112,6 +255,63 @@ CMD_GET_AP_CREDENTIALS = 0x13
 CMD_SET_CHILD_PROFILE = 0x14  # Enable/disable child profile (0=off, 1=on)
 
 
+# ======================
+# Payload Records
+# ======================
+
+@dataclass(slots=True)
+class SensorRecord:
+    """Sensor data payload sent on the sensor characteristic."""
+    type: str = "sensor"
+    deviceId: str = "orb-01"
+    sessionId: str = ""
+    childId: str = ""
+    timestamp: Union[str, int] = ""  # See TIMESTAMP_FORMAT
+    pressure: float = 0.0
+    pressureType: str = "none"
+    temperature: float = 0.0
+    motion: str = "none"
+    proximityZone: str = "UNKNOWN"  # NEAR, MEDIUM, FAR, OUT_OF_RANGE, UNKNOWN
+    distressAlert: str = "none"     # PATTERN_3GRIP, MOTION_3X, or none
+    distressType: str = "none"      # Stressed, Tantrum, or none (dominant grip type)
+    distressMotion: str = "none"    # Motion type for MOTION_3X alerts (impact, shake, bounce, etc.)
+    environmentalNoise: float = 0.0  # dB level (float)
+    noiseLevel: str = "quiet"       # silent, quiet, moderate, loud, very_loud
+
+
+@dataclass(slots=True)
+class BehaviorRecord:
+    """Behavior data payload (Roboflow autism behavior detection).
+
+    Model: https://universe.roboflow.com/asddetection/autism-ximav
+    Classes: Aggressive_Behavior, Avoid_Eye_Contact, Covering_Ears, Finger_Bitting,
+             Finger_Flicking, Hand_Clapping, Hand_Flapping, Head_Banging, Holding_Item,
+             Jumping, SIB_Bitting, Shaking_Legs, Toe_Walking, Tpot_Stimming, Twirling,
+             Weird_Expression
+    """
+    type: str = "behavior"
+    deviceId: str = "orb-01"
+    sessionId: str = ""
+    childId: str = ""
+    timestamp: Union[str, int] = ""  # See TIMESTAMP_FORMAT
+    behaviorLabel: str = "none"  # One of the 16 Roboflow classes or "none"
+    confidence: float = 0.0
+
+
+def _intern(value):
+    """Intern a closed-vocabulary field value (grip/motion/zone/alert/noise/behavior label).
+
+    Values parsed from ESP32 messages arrive as fresh strings; interning
+    them lets the unchanged-payload check compare by identity.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+def _content(record) -> tuple:
+    """Record fields except the timestamp, to tell real changes from re-sends."""
+    return tuple(getattr(record, name) for name in record.__slots__ if name != "timestamp")
+
+
 class StressBallService(Service):
     """BLE GATT Service for StressBall Hub using bluez-peripheral."""
 
@@ -125,54 +325,51 @@ class StressBallService(Service):
 
         # Main service callback for service control (child profile toggle)
         self._main_service_callback = None
+        # Event loop the GATT handlers run on (set by BLEService.start)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Payload records (field order is the on-wire key order)
+        self._sensor_data = SensorRecord()
+        self._emotion_data = BehaviorRecord()
+        # Record content at the last notification (None = never sent)
+        self._sensor_sent: Optional[tuple] = None
+        self._emotion_sent: Optional[tuple] = None
 
-        # Default sensor data payload
-        self._sensor_data = {
-            "type": "sensor",
-            "deviceId": "orb-01",
-            "sessionId": "",
-            "childId": "",
-            "timestamp": "",
-            "pressure": 0.0,
-            "pressureType": "none",
-            "temperature": 0.0,
-            "motion": "none",
-            "proximityZone": "UNKNOWN",  # NEAR, MEDIUM, FAR, OUT_OF_RANGE, UNKNOWN
-            "distressAlert": "none",  # PATTERN_3GRIP, MOTION_3X, or none
-            "distressType": "none",  # Stressed, Tantrum, or none (dominant grip type)
-            "distressMotion": "none",  # Motion type for MOTION_3X alerts (impact, shake, bounce, etc.)
-            "environmentalNoise": 0.0,  # dB level (float)
-            "noiseLevel": "quiet",  # silent, quiet, moderate, loud, very_loud
-        }
-
-        # Default behavior data payload (Roboflow autism behavior detection)
-        # Model: https://universe.roboflow.com/asddetection/autism-ximav
-        # Classes: Aggressive_Behavior, Avoid_Eye_Contact, Covering_Ears, Finger_Bitting,
-        #          Finger_Flicking, Hand_Clapping, Hand_Flapping, Head_Banging, Holding_Item,
-        #          Jumping, SIB_Bitting, Shaking_Legs, Toe_Walking, Tpot_Stimming, Twirling,
-        #          Weird_Expression
-        self._emotion_data = {
-            "type": "behavior",
-            "deviceId": "orb-01",
-            "sessionId": "",
-            "childId": "",
-            "timestamp": "",
-            "behaviorLabel": "none",  # One of the 16 Roboflow classes or "none"
-            "confidence": 0.0,
-        }
+        # Negotiated ATT MTU per connected device path, learned from the
+        # options BlueZ passes to characteristic reads/writes
+        self._peer_mtu: dict = {}
 
         # Session context
         self._session_id = ""
         self._child_id = ""
 
+        # Encoded settings JSON, keyed by the distress_service settings version
+        self._settings_version = -1
+        self._settings_bytes = b""
+        self._full_settings_source = None  # The compact bytes the full payload was built from
+        self._full_settings_bytes = b""
+        self._status_version = -1  # Same, for the MessagePack status payload
+        self._status_bytes = b""
+
+        # Last encoded sensor/behavior payloads, shared by notifications and
+        # reads until the data changes (None = stale). dbus_next only accepts
+        # bytes for 'ay' values, so these are immutable bytes, not bytearrays.
+        self._sensor_value: Optional[bytes] = None
+        self._emotion_value: Optional[bytes] = None
+        # Read-only dict snapshots for get_*_payload(), rebuilt after a change
+        self._sensor_view: Optional[MappingProxyType] = None
+        self._emotion_view: Optional[MappingProxyType] = None
+
     def set_session_context(self, session_id: str, child_id: str):
         """Set the current session and child ID."""
         self._session_id = session_id
         self._child_id = child_id
-        self._sensor_data["sessionId"] = session_id
-        self._sensor_data["childId"] = child_id
-        self._emotion_data["sessionId"] = session_id
-        self._emotion_data["childId"] = child_id
+        self._sensor_data.sessionId = session_id
+        self._sensor_data.childId = child_id
+        self._emotion_data.sessionId = session_id
+        self._emotion_data.childId = child_id
+        self._sensor_value = self._sensor_view = None
+        self._emotion_value = self._emotion_view = None
 
     def set_streaming_service(self, streaming_service):
         """Set the streaming service reference for live streaming commands."""
@@ -187,6 +384,10 @@ class StressBallService(Service):
         """
         self._main_service_callback = callback
 
+    def set_event_loop(self, loop: asyncio.AbstractEventLoop):
+        """Set the event loop used to schedule main service callbacks."""
+        self._loop = loop
+
     def update_sensor_data(self, pressure: float, pressure_type: str, temperature: float, motion: str, proximity_zone: str = "UNKNOWN", distress_alert: str = "none", distress_type: str = "none", distress_motion: str = "none", environmental_noise: float = 0.0, noise_level: str = "quiet"):
         """Update sensor data payload.
 
@@ -202,24 +403,26 @@ class StressBallService(Service):
             environmental_noise: Environmental noise level in dB
             noise_level: Noise category (silent, quiet, moderate, loud, very_loud)
         """
-        from datetime import datetime
-        self._sensor_data["pressure"] = pressure
-        self._sensor_data["pressureType"] = pressure_type
-        self._sensor_data["temperature"] = temperature
-        self._sensor_data["motion"] = motion
-        self._sensor_data["proximityZone"] = proximity_zone
-        self._sensor_data["distressAlert"] = distress_alert
-        self._sensor_data["distressType"] = distress_type
-        self._sensor_data["distressMotion"] = distress_motion
-        self._sensor_data["environmentalNoise"] = environmental_noise
-        self._sensor_data["noiseLevel"] = noise_level
-        self._sensor_data["timestamp"] = datetime.now().isoformat() + "Z"
-        self._sensor_data["sessionId"] = self._session_id
-        self._sensor_data["childId"] = self._child_id
+        data = self._sensor_data
+        data.pressure = pressure
+        data.pressureType = _intern(pressure_type)
+        data.temperature = temperature
+        data.motion = _intern(motion)
+        data.proximityZone = _intern(proximity_zone)
+        data.distressAlert = _intern(distress_alert)
+        data.distressType = _intern(distress_type)
+        data.distressMotion = _intern(distress_motion)
+        data.environmentalNoise = environmental_noise
+        data.noiseLevel = _intern(noise_level)
+        data.timestamp = _now_ts()
+        data.sessionId = self._session_id
+        data.childId = self._child_id
+        self._sensor_value = self._sensor_view = None
 
     def update_proximity_zone(self, proximity_zone: str):
         """Update proximity zone only."""
-        self._sensor_data["proximityZone"] = proximity_zone
+        self._sensor_data.proximityZone = _intern(proximity_zone)
+        self._sensor_value = self._sensor_view = None
 
     def update_distress_data(self, distress_alert: str, distress_type: str, distress_motion: str = "none"):
         """Update distress alert data from ESP32.
@@ -237,15 +440,19 @@ class StressBallService(Service):
                 - "impact", "shake", "bounce", "spinning", "rocking", etc.
                 - "none": No motion (for PATTERN_3GRIP or no alert)
         """
-        self._sensor_data["distressAlert"] = distress_alert
-        self._sensor_data["distressType"] = distress_type
-        self._sensor_data["distressMotion"] = distress_motion
+        data = self._sensor_data
+        data.distressAlert = _intern(distress_alert)
+        data.distressType = _intern(distress_type)
+        data.distressMotion = _intern(distress_motion)
+        self._sensor_value = self._sensor_view = None
 
     def clear_distress_data(self):
         """Clear distress alert data (call after distress is handled)."""
-        self._sensor_data["distressAlert"] = "none"
-        self._sensor_data["distressType"] = "none"
-        self._sensor_data["distressMotion"] = "none"
+        data = self._sensor_data
+        data.distressAlert = "none"
+        data.distressType = "none"
+        data.distressMotion = "none"
+        self._sensor_value = self._sensor_view = None
 
     def update_behavior_data(self, behavior_label: str, confidence: float):
         """Update behavior data payload from Roboflow autism detection.
@@ -258,81 +465,220 @@ class StressBallService(Service):
                 - Weird_Expression
             confidence: Detection confidence (0.0 - 1.0)
         """
-        from datetime import datetime
-        self._emotion_data["behaviorLabel"] = behavior_label
-        self._emotion_data["confidence"] = confidence
-        self._emotion_data["timestamp"] = datetime.now().isoformat() + "Z"
-        self._emotion_data["sessionId"] = self._session_id
-        self._emotion_data["childId"] = self._child_id
+        data = self._emotion_data
+        data.behaviorLabel = _intern(behavior_label)
+        data.confidence = confidence
+        data.timestamp = _now_ts()
+        data.sessionId = self._session_id
+        data.childId = self._child_id
+        self._emotion_value = self._emotion_view = None
 
     # Keep old method name for backwards compatibility
     def update_emotion_data(self, emotion_label: str, confidence: float):
         """Deprecated: Use update_behavior_data instead."""
         self.update_behavior_data(emotion_label, confidence)
 
-    def get_sensor_payload(self) -> dict:
-        """Get current sensor payload."""
-        return self._sensor_data.copy()
-
-    def get_behavior_payload(self) -> dict:
-        """Get current behavior payload."""
-        return self._emotion_data.copy()
+    def get_sensor_payload(self) -> MappingProxyType:
+        """Get current sensor payload (read-only; dict() it to modify)."""
+        if self._sensor_view is None:
+            self._sensor_view = MappingProxyType(asdict(self._sensor_data))
+        return self._sensor_view
+
+    def get_behavior_payload(self) -> MappingProxyType:
+        """Get current behavior payload (read-only; dict() it to modify)."""
+        if self._emotion_view is None:
+            self._emotion_view = MappingProxyType(asdict(self._emotion_data))
+        return self._emotion_view
+
+    def get_sensor_bytes(self) -> bytes:
+        """Get current sensor payload encoded for the wire (cached until it changes)."""
+        if self._sensor_value is None:
+            self._sensor_value = _encode(self._sensor_data)
+        return self._sensor_value
+
+    def get_behavior_bytes(self) -> bytes:
+        """Get current behavior payload encoded for the wire (cached until it changes)."""
+        if self._emotion_value is None:
+            self._emotion_value = _encode(self._emotion_data)
+        return self._emotion_value
 
     # Keep old method name for backwards compatibility
-    def get_emotion_payload(self) -> dict:
+    def get_emotion_payload(self) -> MappingProxyType:
         """Deprecated: Use get_behavior_payload instead."""
         return self.get_behavior_payload()
 
     # ==================
     # BLE Notification Methods
     # ==================
-    def notify_sensor_data(self):
+    def notify_sensor_data(self, force: bool = False):
         """Send BLE notification with current sensor data.
 
         Call this to push sensor data to connected mobile app.
         Used for:
         - Periodic updates (every 5 seconds)
-        - Immediate updates on distress events
+        - Immediate updates on distress events (force=True)
+
+        Skipped unless something other than the timestamp changed since the
+        last notification, or force is set.
         """
         try:
-            from datetime import datetime
+            content = _content(self._sensor_data)
+            if not force and content == self._sensor_sent:
+                return True
+            self._sensor_sent = content
             # Update timestamp before sending
-            self._sensor_data["timestamp"] = datetime.now().isoformat() + "Z"
-            payload = json.dumps(self._sensor_data).encode()
-            self.sensor_char.changed(payload)
+            self._sensor_data.timestamp = _now_ts()
+            self._sensor_view = None
+            self._sensor_value = payload = _encode(self._sensor_data)
+            self._send(self.sensor_char, payload)
             return True
         except Exception as e:
-            print(f"[BLE] Failed to notify sensor data: {e}")
+            logger.error("Failed to notify sensor data: %s", e)
             return False
 
-    def notify_behavior_data(self):
+    def notify_behavior_data(self, force: bool = False):
         """Send BLE notification with current behavior data.
 
         Call this to push behavior detection data to connected mobile app.
         Used for:
         - Periodic updates (every 5 seconds)
         - Immediate updates on behavior detection
+
+        Skipped unless the behavior changed since the last notification,
+        or force is set.
         """
         try:
-            from datetime import datetime
+            content = _content(self._emotion_data)
+            if not force and content == self._emotion_sent:
+                return True
+            self._emotion_sent = content
             # Update timestamp before sending
-            self._emotion_data["timestamp"] = datetime.now().isoformat() + "Z"
-            payload = json.dumps(self._emotion_data).encode()
-            self.emotion_char.changed(payload)
+            self._emotion_data.timestamp = _now_ts()
+            self._emotion_view = None
+            self._emotion_value = payload = _encode(self._emotion_data)
+            self._send(self.emotion_char, payload)
             return True
         except Exception as e:
-            print(f"[BLE] Failed to notify behavior data: {e}")
+            logger.error("Failed to notify behavior data: %s", e)
             return False
 
-    def notify_all(self):
+    def notify_all(self, force: bool = False):
         """Send BLE notifications for both sensor and behavior data.
 
         Convenience method to send both payloads at once.
         """
-        sensor_ok = self.notify_sensor_data()
-        behavior_ok = self.notify_behavior_data()
+        sensor_ok = self.notify_sensor_data(force)
+        behavior_ok = self.notify_behavior_data(force)
         return sensor_ok and behavior_ok
 
+    def notify_batch(self, force: bool = False) -> bool:
+        """Send the periodic sensor, behavior and status notifications together.
+
+        Used by the 5 second heartbeat in main_service. All three payloads
+        share one timestamp and are encoded back-to-back before any is sent;
+        sensor/behavior are skipped when unchanged, as in notify_all().
+        Event-driven updates keep using the individual notify_* methods.
+        """
+        try:
+            timestamp = _now_ts()
+            sensor = emotion = None
+
+            content = _content(self._sensor_data)
+            if force or content != self._sensor_sent:
+                self._sensor_sent = content
+                self._sensor_data.timestamp = timestamp
+                self._sensor_view = None
+                self._sensor_value = sensor = _encode(self._sensor_data)
+
+            content = _content(self._emotion_data)
+            if force or content != self._emotion_sent:
+                self._emotion_sent = content
+                self._emotion_data.timestamp = timestamp
+                self._emotion_view = None
+                self._emotion_value = emotion = _encode(self._emotion_data)
+
+            status = self._encode_status()
+
+            if sensor is not None:
+                self._send(self.sensor_char, sensor)
+            if emotion is not None:
+                self._send(self.emotion_char, emotion)
+            self._send(self.status_char, status)
+            return True
+        except Exception as e:
+            logger.error("Failed to send batched notifications: %s", e)
+            return False
+
+    def _encode_settings(self) -> bytes:
+        """Compact settings JSON, re-encoded only when the settings change.
+
+        Settings are also changed by main_service and the ESP32 listener
+        calling distress_service directly, so the cache is keyed by the
+        version counter distress_service bumps on every change.
+        """
+        ds = _load_distress()
+        version = ds.get_settings_version()
+        if version != self._settings_version:
+            self._settings_version = version
+            self._settings_bytes = _dumps(ds.get_settings())
+        return self._settings_bytes
+
+    def _encode_status(self) -> bytes:
+        """Compact settings in the wire format, for the status characteristic."""
+        if _wire_format() == "json":
+            return self._encode_settings()
+        ds = _load_distress()
+        version = ds.get_settings_version()
+        if version != self._status_version:
+            self._status_version = version
+            self._status_bytes = _encode(ds.get_settings())
+        return self._status_bytes
+
+    def _encode_full_settings(self) -> bytes:
+        """Full settings JSON (with animation/sound lists), cached like _encode_settings.
+
+        The lists never change at runtime, so they are encoded once and
+        spliced onto the compact settings object.
+        """
+        compact = self._encode_settings()
+        if compact is not self._full_settings_source:
+            self._full_settings_source = compact
+            static = _static_settings_json()
+            self._full_settings_bytes = compact[:-1] + b"," + static + b"}" if static else compact
+        return self._full_settings_bytes
+
+    def _note_mtu(self, options):
+        """Record the ATT MTU BlueZ reports for the device behind a read/write."""
+        mtu = getattr(options, "mtu", None)
+        device = getattr(options, "device", None)
+        if mtu and device:
+            self._peer_mtu[device] = mtu
+
+    def forget_device(self, device_path: str):
+        """Drop per-connection state when a device disconnects."""
+        self._peer_mtu.pop(device_path, None)
+
+    def _send(self, char, payload: bytes):
+        """Notify payload, split to fit the smallest known ATT MTU if enabled.
+
+        With NOTIFY_CHUNKING on, a payload longer than MTU-3 (which BlueZ
+        would truncate) goes out as numbered chunks, each prefixed with two
+        bytes (index, count). A whole payload starts with '{' (JSON) or a
+        map byte >= 0x80 (MessagePack), never with a chunk index, so the app
+        can tell the two apart. Otherwise, or with no MTU known yet,
+        payloads are sent whole.
+        """
+        if NOTIFY_CHUNKING and self._peer_mtu:
+            room = min(self._peer_mtu.values()) - ATT_NOTIFY_OVERHEAD
+            size = room - 2
+            if len(payload) > room and size > 0:
+                count = -(-len(payload) // size)
+                if count < 0x7B:
+                    for i in range(count):
+                        char.changed(bytes((i, count)) + payload[i * size:(i + 1) * size])
+                    return
+        char.changed(payload)
+
     def notify_status(self):
         """Send BLE notification with current status/settings.
 
@@ -342,12 +688,10 @@ class StressBallService(Service):
         - When ESP32 connection status changes
         """
         try:
-            settings = get_settings()
-            payload = json.dumps(settings).encode()
-            self.status_char.changed(payload)
+            self._send(self.status_char, self._encode_status())
             return True
         except Exception as e:
-            print(f"[BLE] Failed to notify status: {e}")
+            logger.error("Failed to notify status: %s", e)
             return False
 
     # ==================
@@ -356,12 +700,13 @@ class StressBallService(Service):
     @characteristic(CHAR_SETTINGS_UUID, CharFlags.READ | CharFlags.WRITE)
     def settings_char(self, options):
         """Read current settings as JSON (full version with animation/sound lists)."""
-        settings = get_full_settings()
-        return json.dumps(settings).encode()
+        self._note_mtu(options)
+        return self._encode_full_settings()
 
     @settings_char.setter
     def settings_char(self, value, options):
         """Write settings from mobile app."""
+        self._note_mtu(options)
         self._process_settings(value)
         return b""  # Return empty bytes to indicate success
 
@@ -371,11 +716,13 @@ class StressBallService(Service):
     @characteristic(CHAR_COMMAND_UUID, CharFlags.WRITE | CharFlags.WRITE_WITHOUT_RESPONSE)
     def command_char(self, options):
         """Command characteristic (write-only, return empty on read)."""
+        self._note_mtu(options)
         return b""
 
     @command_char.setter
     def command_char(self, value, options):
         """Process command from mobile app."""
+        self._note_mtu(options)
         self._process_command(value)
 
     # ==================
@@ -383,9 +730,9 @@ class StressBallService(Service):
     # ==================
     @characteristic(CHAR_STATUS_UUID, CharFlags.READ | CharFlags.NOTIFY)
     def status_char(self, options):
-        """Read current status as JSON."""
-        settings = get_settings()
-        return json.dumps(settings).encode()
+        """Read current status (JSON or MessagePack, see WIRE_FORMAT)."""
+        self._note_mtu(options)
+        return self._encode_status()
 
     # ==================
     # Sensor Data Characteristic (Read/Notify)
@@ -393,7 +740,8 @@ class StressBallService(Service):
     @characteristic(CHAR_SENSOR_UUID, CharFlags.READ | CharFlags.NOTIFY)
     def sensor_char(self, options):
         """Read current sensor data as JSON."""
-        return json.dumps(self._sensor_data).encode()
+        self._note_mtu(options)
+        return self.get_sensor_bytes()
 
     # ==================
     # Behavior Data Characteristic (Read/Notify) - Roboflow autism detection
@@ -401,165 +749,146 @@ class StressBallService(Service):
     @characteristic(CHAR_EMOTION_UUID, CharFlags.READ | CharFlags.NOTIFY)
     def emotion_char(self, options):
         """Read current behavior data as JSON (from Roboflow autism detection)."""
-        return json.dumps(self._emotion_data).encode()
+        self._note_mtu(options)
+        return self.get_behavior_bytes()
 
     # ==================
     # Command Processing
     # ==================
     def _process_command(self, data: bytes):
         """Process binary command from mobile app."""
-        if len(data) < 1:
+        if not data:
             return
 
-        cmd = data[0]
-        param = data[1] if len(data) > 1 else 0
-
-        print(f"[BLE] Received command: 0x{cmd:02X}, param: {param}")
-
-        if cmd == CMD_SET_ANIMATION:
-            set_animation(param)
-        elif cmd == CMD_SET_SOUND:
-            set_sound(param)
-        elif cmd == CMD_FIND_DEVICE:
-            find_my_device()
-        elif cmd == CMD_ENABLE_ANIMATION:
-            enable_animation(param == 1)
-        elif cmd == CMD_ENABLE_SOUND:
-            enable_sound(param == 1)
-        elif cmd == CMD_STOP_SOUND:
-            stop_sound()
-        elif cmd == CMD_GET_SETTINGS:
-            # Settings will be read via read characteristic
-            pass
-        elif cmd == CMD_PLAY_SOUND:
-            # Play specific sound on ESP32 (mobile app request)
-            print(f"[DEBUG] BLE received CMD_PLAY_SOUND with param: {param} from mobile app")
-            play_sound(param)
-            print(f"[BLE] Mobile app requested play sound {param}")
-        elif cmd == CMD_PLAY_ANIMATION:
-            # Play animation immediately on TFT display (mobile app request)
-            # Distress signals will still take priority
-            play_animation_now(param)
-            print(f"[BLE] Mobile app requested play animation {param}")
-        elif cmd == CMD_SET_VOLUME:
-            # Forward volume command to ESP32 via distress_service
-            print(f"[BLE] Received CMD_SET_VOLUME with param: {param}")
-            from services.distress_service import set_volume
-            set_volume(param)
-            print(f"[BLE] Volume set to {param}")
+        cmd, param = _CMD_HDR.unpack_from(data if len(data) >= 2 else data + _ZERO_PAD)
+
+        logger.debug("Received command: 0x%02X, param: %s", cmd, param)
+        handler = self._CMD_DISPATCH.get(cmd)
+        if handler is not None:
+            handler(self, param)
+
+    # Command handlers: (self, param), dispatched through _CMD_DISPATCH
+    def _cmd_set_animation(self, param: int):
+        _load_distress().set_animation(param)
+
+    def _cmd_set_sound(self, param: int):
+        _load_distress().set_sound(param)
+
+    def _cmd_find_device(self, param: int):
+        _load_distress().find_my_device()
+
+    def _cmd_enable_animation(self, param: int):
+        _load_distress().enable_animation(param == 1)
+
+    def _cmd_enable_sound(self, param: int):
+        _load_distress().enable_sound(param == 1)
+
+    def _cmd_stop_sound(self, param: int):
+        _load_distress().stop_sound()
+
+    def _cmd_get_settings(self, param: int):
+        # Settings will be read via read characteristic
+        pass
+
+    def _cmd_play_sound(self, param: int):
+        # Play specific sound on ESP32 (mobile app request)
+        logger.debug("Received CMD_PLAY_SOUND with param: %s from mobile app", param)
+        _load_distress().play_sound(param)
+        logger.info("Mobile app requested play sound %s", param)
+
+    def _cmd_play_animation(self, param: int):
+        # Play animation immediately on TFT display (mobile app request)
+        # Distress signals will still take priority
+        _load_distress().play_animation_now(param)
+        logger.info("Mobile app requested play animation %s", param)
+
+    def _cmd_set_volume(self, param: int):
+        # Forward volume command to ESP32 via distress_service
+        _load_distress().set_volume(param)
+        logger.info("Volume set to %s", param)
+
+    def _cmd_start_stream(self, param: int):
+        self._handle_start_stream()
+
+    def _cmd_stop_stream(self, param: int):
+        self._handle_stop_stream()
+
+    def _cmd_get_stream_status(self, param: int):
+        self._handle_get_stream_status()
+
+    def _cmd_get_ap_credentials(self, param: int):
+        self._handle_get_ap_credentials()
+
+    def _cmd_set_child_profile(self, param: int):
+        active = param == 1
+        logger.debug("Received CMD_SET_CHILD_PROFILE: param=%s, active=%s", param, active)
+        _load_distress().set_child_profile_active(active)
+        # Notify main service to start/stop optional services (async callback)
+        if self._main_service_callback:
+            logger.debug("Calling main_service_callback with child_profile=%s", active)
+            loop = self._loop
+            if loop is not None and loop.is_running():
+                loop.create_task(self._main_service_callback('child_profile', active))
+            else:
+                logger.warning("Cannot update child profile - no event loop running")
+        else:
+            logger.warning("main_service_callback not set!")
+        logger.info("Child profile %s", 'activated' if active else 'deactivated')
+
+    _CMD_DISPATCH = {
+        CMD_SET_ANIMATION: _cmd_set_animation,
+        CMD_SET_SOUND: _cmd_set_sound,
+        CMD_FIND_DEVICE: _cmd_find_device,
+        CMD_ENABLE_ANIMATION: _cmd_enable_animation,
+        CMD_ENABLE_SOUND: _cmd_enable_sound,
+        CMD_STOP_SOUND: _cmd_stop_sound,
+        CMD_GET_SETTINGS: _cmd_get_settings,
+        CMD_PLAY_SOUND: _cmd_play_sound,
+        CMD_PLAY_ANIMATION: _cmd_play_animation,
+        CMD_SET_VOLUME: _cmd_set_volume,
         # Live streaming commands
-        elif cmd == CMD_START_LIVE_STREAM:
-            self._handle_start_stream()
-        elif cmd == CMD_STOP_LIVE_STREAM:
-            self._handle_stop_stream()
-        elif cmd == CMD_GET_STREAM_STATUS:
-            self._handle_get_stream_status()
-        elif cmd == CMD_GET_AP_CREDENTIALS:
-            self._handle_get_ap_credentials()
+        CMD_START_LIVE_STREAM: _cmd_start_stream,
+        CMD_STOP_LIVE_STREAM: _cmd_stop_stream,
+        CMD_GET_STREAM_STATUS: _cmd_get_stream_status,
+        CMD_GET_AP_CREDENTIALS: _cmd_get_ap_credentials,
         # Child profile control
-        elif cmd == CMD_SET_CHILD_PROFILE:
-            import asyncio
-            active = param == 1
-            print(f"[BLE] [DEBUG] Received CMD_SET_CHILD_PROFILE: param={param}, active={active}")
-            set_child_profile_active(active)
-            # Notify main service to start/stop optional services (async callback)
-            if self._main_service_callback:
-                print(f"[BLE] [DEBUG] Calling main_service_callback with child_profile={active}")
-                try:
-                    loop = asyncio.get_running_loop()
-                    loop.create_task(self._main_service_callback('child_profile', active))
-                except RuntimeError:
-                    # No event loop running - log warning
-                    print("[BLE] WARNING: Cannot update child profile - no event loop running")
-            else:
-                print("[BLE] [DEBUG] WARNING: main_service_callback not set!")
-            print(f"[BLE] Child profile {'activated' if active else 'deactivated'}")
+        CMD_SET_CHILD_PROFILE: _cmd_set_child_profile,
+    }
 
     def _handle_start_stream(self):
         """Handle START_LIVE_STREAM command."""
-        import asyncio
 
         # Check if child profile is active (required for streaming)
-        if not is_child_profile_active():
-            print("[BLE] Cannot start stream: child profile not active")
-            self._notify_stream_status({
-                "state": 5,  # ERROR state
-                "stateName": "ERROR",
-                "errorMessage": "Child profile not active. Activate a child profile first.",
-                "apSSID": "",
-                "apPassword": "",
-                "videoUrl": "",
-                "audioUrl": "",
-                "videoClients": 0,
-                "audioClients": 0,
-                "startTime": 0,
-                "duration": 0,
-            })
+        if not _load_distress().is_child_profile_active():
+            logger.warning("Cannot start stream: child profile not active")
+            self._notify_stream_error("Child profile not active. Activate a child profile first.")
             return
 
         if not self._streaming_service:
-            print("[BLE] Streaming service not available")
-            self._notify_stream_status({
-                "state": 5,  # ERROR state
-                "stateName": "ERROR",
-                "errorMessage": "Streaming service not initialized",
-                "apSSID": "",
-                "apPassword": "",
-                "videoUrl": "",
-                "audioUrl": "",
-                "videoClients": 0,
-                "audioClients": 0,
-                "startTime": 0,
-                "duration": 0,
-            })
+            logger.warning("Streaming service not available")
+            self._notify_stream_error("Streaming service not initialized")
             return
 
         # Check if camera service is available before starting
         if not self._streaming_service.camera_service:
-            print("[BLE] Camera service not available for streaming")
-            self._notify_stream_status({
-                "state": 5,  # ERROR state
-                "stateName": "ERROR",
-                "errorMessage": "Camera service not available",
-                "apSSID": "",
-                "apPassword": "",
-                "videoUrl": "",
-                "audioUrl": "",
-                "videoClients": 0,
-                "audioClients": 0,
-                "startTime": 0,
-                "duration": 0,
-            })
+            logger.warning("Camera service not available for streaming")
+            self._notify_stream_error("Camera service not available")
             return
 
-        print("[BLE] Starting live stream...")
+        logger.info("Starting live stream...")
 
         async def _start_stream_safe():
             """Wrapper to safely start streaming without crashing BLE."""
             try:
                 success = await self._streaming_service.start_streaming()
                 if not success:
-                    print("[BLE] Streaming failed to start (returned False)")
+                    logger.error("Streaming failed to start (returned False)")
                     # Status should already be updated by streaming_service
             except Exception as e:
-                print(f"[BLE] Error starting stream (BLE stays connected): {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error starting stream (BLE stays connected): %s", e)
                 # Notify mobile app of error via status characteristic
                 try:
-                    self._notify_stream_status({
-                        "state": 5,  # ERROR state
-                        "stateName": "ERROR",
-                        "errorMessage": str(e),
-                        "apSSID": "",
-                        "apPassword": "",
-                        "videoUrl": "",
-                        "audioUrl": "",
-                        "videoClients": 0,
-                        "audioClients": 0,
-                        "startTime": 0,
-                        "duration": 0,
-                    })
+                    self._notify_stream_error(str(e))
                 except Exception:
                     pass
 
@@ -567,28 +896,25 @@ class StressBallService(Service):
 
     def _handle_stop_stream(self):
         """Handle STOP_LIVE_STREAM command."""
-        import asyncio
         if not self._streaming_service:
-            print("[BLE] Streaming service not available")
+            logger.warning("Streaming service not available")
             return
 
-        print("[BLE] Stopping live stream...")
+        logger.info("Stopping live stream...")
 
         async def _stop_stream_safe():
             """Wrapper to safely stop streaming without crashing BLE."""
             try:
                 await self._streaming_service.stop_streaming()
             except Exception as e:
-                print(f"[BLE] Error stopping stream (BLE stays connected): {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error stopping stream (BLE stays connected): %s", e)
 
         asyncio.create_task(_stop_stream_safe())
 
     def _handle_get_stream_status(self):
         """Handle GET_STREAM_STATUS command - sends status via notification."""
         if not self._streaming_service:
-            print("[BLE] Streaming service not available")
+            logger.warning("Streaming service not available")
             return
 
         status = self._streaming_service.get_status_dict()
@@ -597,20 +923,32 @@ class StressBallService(Service):
     def _handle_get_ap_credentials(self):
         """Handle GET_AP_CREDENTIALS command - sends credentials via notification."""
         if not self._streaming_service:
-            print("[BLE] Streaming service not available")
+            logger.warning("Streaming service not available")
             return
 
         creds = self._streaming_service.get_ap_credentials()
         self._notify_stream_status({"type": "ap_credentials", **creds})
 
+    def _notify_stream_error(self, message: str):
+        """Send an ERROR stream status carrying the given message."""
+        self._notify_stream_status({**_STREAM_ERROR_STATUS, "errorMessage": message})
+
     def _notify_stream_status(self, data: dict):
         """Send stream status/credentials via status characteristic notification."""
         try:
-            payload = json.dumps(data).encode()
-            self.status_char.changed(payload)
-            print(f"[BLE] Sent stream status: {data.get('state', data.get('type', 'unknown'))}")
+            payload = _encode(data)
+            self._send(self.status_char, payload)
+            logger.debug("Sent stream status: %s", data.get('state', data.get('type', 'unknown')))
         except Exception as e:
-            print(f"[BLE] Failed to notify stream status: {e}")
+            logger.error("Failed to notify stream status: %s", e)
+
+    # Plain settings keys -> distress_service setter, applied in this order
+    _SETTINGS_SETTERS = (
+        ("animation", "set_animation"),
+        ("sound", "set_sound"),
+        ("animation_enabled", "enable_animation"),
+        ("sound_enabled", "enable_sound"),
+    )
 
     def _process_settings(self, data: bytes):
         """Process settings JSON from mobile app."""
@@ -619,50 +957,43 @@ class StressBallService(Service):
             if len(data) > 4096:  # 4KB limit
                 raise ValueError(f"Settings payload too large: {len(data)} bytes")
 
-            settings = json.loads(data.decode('utf-8'))
-            print(f"[BLE] Received settings: {settings}")
+            settings = _loads(data)
+            logger.debug("Received settings: %s", settings)
 
             # Validate it's a dictionary
             if not isinstance(settings, dict):
                 raise ValueError("Settings must be a JSON object")
 
-            if "animation" in settings:
-                set_animation(settings["animation"])
-            if "sound" in settings:
-                set_sound(settings["sound"])
-            if "animation_enabled" in settings:
-                enable_animation(settings["animation_enabled"])
-            if "sound_enabled" in settings:
-                enable_sound(settings["sound_enabled"])
-            if "find_device" in settings and settings["find_device"]:
-                find_my_device()
+            ds = _load_distress()
+            for key, setter in self._SETTINGS_SETTERS:
+                value = settings.get(key, _MISSING)
+                if value is not _MISSING:
+                    getattr(ds, setter)(value)
+            if settings.get("find_device"):
+                ds.find_my_device()
             if "play_sound" in settings:
-                print(f"[BLE] [DEBUG] play_sound found in settings: {settings['play_sound']}")
-                print(f"[BLE] [DEBUG] This will trigger PLAY command to ESP32!")
-                play_sound(settings["play_sound"])
-                print(f"[BLE] Mobile app requested play sound {settings['play_sound']}")
+                logger.debug("play_sound found in settings: %s", settings['play_sound'])
+                logger.debug("This will trigger PLAY command to ESP32!")
+                ds.play_sound(settings["play_sound"])
+                logger.info("Mobile app requested play sound %s", settings['play_sound'])
             if "child_profile_active" in settings:
-                import asyncio
                 active = settings["child_profile_active"]
-                set_child_profile_active(active)
+                ds.set_child_profile_active(active)
                 # Notify main service to start/stop optional services (async callback)
                 if self._main_service_callback:
-                    try:
-                        loop = asyncio.get_running_loop()
+                    loop = self._loop
+                    if loop is not None and loop.is_running():
                         loop.create_task(self._main_service_callback('child_profile', active))
-                    except RuntimeError:
-                        # No event loop running - log warning instead of trying asyncio.run
-                        print("[BLE] WARNING: Cannot update child profile - no event loop running")
+                    else:
                         # Still update the state variable even if callback can't be called
-                print(f"[BLE] Child profile set via JSON: {'active' if active else 'inactive'}")
+                        logger.warning("Cannot update child profile - no event loop running")
+                logger.info("Child profile set via JSON: %s", 'active' if active else 'inactive')
 
         except json.JSONDecodeError as e:
-            print(f"[BLE] Invalid JSON in settings: {e}")
+            logger.error("Invalid JSON in settings: %s", e)
             raise  # Let BLE layer handle error response
         except Exception as e:
-            print(f"[BLE] Error processing settings: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error processing settings: %s", e)
             raise  # Propagate error to mobile app
 
 
@@ -676,34 +1007,38 @@ class BLEService:
         self.advert = None
         self.agent = None
         self.is_running = False
+        self._adapter_path = "/org/bluez/hci0"
+        self._props_event: Optional[asyncio.Event] = None
+        self._props_subscribed = False  # PropertiesChanged signals are arriving
 
     async def start(self):
         """Start the BLE GATT server."""
         if not BLUEZ_AVAILABLE:
-            print("[BLE] Cannot start - 'bluez-peripheral' library not available")
-            print("[BLE] Install with: pip install bluez-peripheral")
+            logger.error("Cannot start - 'bluez-peripheral' library not available")
+            logger.info("Install with: pip install bluez-peripheral")
             return False
 
         try:
-            print("[BLE] Starting BLE GATT server...")
+            logger.info("Starting BLE GATT server...")
 
             # Get D-Bus message bus
+            _patch_dbus_next()
             self.bus = await get_message_bus()
 
             # Get Bluetooth adapter - use direct path to avoid introspection issues
-            adapter_path = "/org/bluez/hci0"
+            adapter_path = await self._find_adapter_path() or "/org/bluez/hci0"
             try:
-                self.adapter = await Adapter.get_first(self.bus)
-                adapter_path = self.adapter.path
-            except Exception as e:
-                print(f"[BLE] Standard adapter lookup failed: {e}")
-                print("[BLE] Trying direct adapter path...")
-                # Fallback: create adapter directly with known path
                 introspection = await self.bus.introspect("org.bluez", adapter_path)
                 proxy = self.bus.get_proxy_object("org.bluez", adapter_path, introspection)
                 self.adapter = Adapter(proxy)
+            except Exception as e:
+                logger.warning("Direct adapter lookup failed: %s", e)
+                logger.info("Trying standard adapter lookup...")
+                self.adapter = await Adapter.get_first(self.bus)
+                adapter_path = self.adapter.path
 
-            print(f"[BLE] Using adapter: {adapter_path}")
+            logger.info("Using adapter: %s", adapter_path)
+            self._adapter_path = adapter_path
 
             # Configure adapter for multiple connections WITHOUT bonding/pairing
             # Get the adapter properties interface
@@ -718,18 +1053,19 @@ class BLEService:
                 # This ensures Samsung S23 and other devices don't force pairing dialogs
                 try:
                     await adapter_props.set_pairable(False)
-                    print("[BLE] Pairable mode disabled (no bonding required)")
+                    logger.info("Pairable mode disabled (no bonding required)")
                 except Exception:
                     pass  # Some systems might not support this
 
-                print("[BLE] Adapter configured for persistent discoverability")
+                logger.info("Adapter configured for persistent discoverability")
             except Exception as e:
-                print(f"[BLE] Warning: Could not set adapter properties: {e}")
+                logger.warning("Could not set adapter properties: %s", e)
 
             # Create and register service
             self.service = StressBallService()
+            self.service.set_event_loop(asyncio.get_running_loop())
             await self.service.register(self.bus, adapter=self.adapter)
-            print(f"[BLE] Registered service: {SERVICE_UUID}")
+            logger.info("Registered service: %s", SERVICE_UUID)
 
             # Create advertisement with connectable=True to allow multiple connections
             # Advertisement(localName, serviceUUIDs, appearance, timeout)
@@ -741,46 +1077,126 @@ class BLEService:
             )
 
             await self.advert.register(self.bus, self.adapter)
-            print(f"[BLE] Advertising as '{BLE_DEVICE_NAME}' (multi-connection enabled)")
+            logger.info("Advertising as '%s' (multi-connection enabled)", BLE_DEVICE_NAME)
 
             # Register agent for pairing (NoIoAgent = no PIN required)
             self.agent = NoIoAgent()
             await self.agent.register(self.bus)
-            print("[BLE] Agent registered (no PIN required)")
+            logger.info("Agent registered (no PIN required)")
 
             self.is_running = True
 
+            # Wake the advertising monitor from BlueZ signals instead of polling
+            await self._subscribe_properties_changed()
+
             # Start advertising monitor to keep advertising active for multiple connections
             asyncio.create_task(self._monitor_advertising())
 
-            print("[BLE] Server started successfully!")
-            print(f"[BLE] Service UUID: {SERVICE_UUID}")
-            print(f"[BLE] Settings Char: {CHAR_SETTINGS_UUID}")
-            print(f"[BLE] Command Char: {CHAR_COMMAND_UUID}")
-            print(f"[BLE] Status Char: {CHAR_STATUS_UUID}")
-            print(f"[BLE] Sensor Char: {CHAR_SENSOR_UUID}")
-            print(f"[BLE] Emotion Char: {CHAR_EMOTION_UUID}")
-            print("[BLE] Multi-connection support: ENABLED")
+            logger.info("Server started successfully!")
+            logger.info("Service UUID: %s", SERVICE_UUID)
+            logger.info("Settings Char: %s", CHAR_SETTINGS_UUID)
+            logger.info("Command Char: %s", CHAR_COMMAND_UUID)
+            logger.info("Status Char: %s", CHAR_STATUS_UUID)
+            logger.info("Sensor Char: %s", CHAR_SENSOR_UUID)
+            logger.info("Emotion Char: %s", CHAR_EMOTION_UUID)
+            logger.info("Multi-connection support: ENABLED")
             return True
 
         except Exception as e:
-            print(f"[BLE] Failed to start: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Failed to start: %s", e)
             return False
 
+    async def _find_adapter_path(self) -> Optional[str]:
+        """Return the first org.bluez.Adapter1 path from GetManagedObjects, if any."""
+        try:
+            reply = await self.bus.call(Message(
+                destination="org.bluez",
+                path="/",
+                interface="org.freedesktop.DBus.ObjectManager",
+                member="GetManagedObjects",
+            ))
+            if reply.message_type == MessageType.ERROR:
+                raise RuntimeError(reply.body[0] if reply.body else reply.error_name)
+        except Exception as e:
+            logger.warning("Could not list BlueZ objects: %s", e)
+            return None
+        for path, ifaces in reply.body[0].items():
+            if "org.bluez.Adapter1" in ifaces:
+                return path
+        return None
+
+    async def _subscribe_properties_changed(self):
+        """Subscribe to BlueZ PropertiesChanged signals under the adapter.
+
+        Device1.Connected changes and the adapter losing Discoverable or
+        coming back Powered set self._props_event, so the advertising
+        monitor only wakes when advertising may need repairing.
+        """
+        self._props_event = asyncio.Event()
+        rule = (
+            "type='signal',sender='org.bluez',"
+            "interface='org.freedesktop.DBus.Properties',"
+            "member='PropertiesChanged',"
+            f"path_namespace='{self._adapter_path}'"
+        )
+        try:
+            await self.bus.call(Message(
+                destination="org.freedesktop.DBus",
+                path="/org/freedesktop/DBus",
+                interface="org.freedesktop.DBus",
+                member="AddMatch",
+                signature="s",
+                body=[rule],
+            ))
+            self.bus.add_message_handler(self._on_properties_changed)
+            self._props_subscribed = True
+        except Exception as e:
+            logger.warning("PropertiesChanged subscription failed, polling only: %s", e)
+
+    def _on_properties_changed(self, message):
+        """D-Bus message handler - never consumes the message."""
+        if (message.message_type != MessageType.SIGNAL
+                or message.member != "PropertiesChanged"
+                or not message.path
+                or not message.path.startswith(self._adapter_path)):
+            return None
+
+        interface, changed = message.body[0], message.body[1]
+        if interface == "org.bluez.Device1" and "Connected" in changed:
+            connected = changed["Connected"].value
+            logger.info("Device %s: %s", 'connected' if connected else 'disconnected', message.path)
+            if not connected and self.service:
+                self.service.forget_device(message.path)
+            self._props_event.set()
+        elif interface == "org.bluez.Adapter1":
+            discoverable = changed.get("Discoverable")
+            powered = changed.get("Powered")
+            if (discoverable is not None and not discoverable.value) or (powered is not None and powered.value):
+                self._props_event.set()
+        return None
+
     async def _monitor_advertising(self):
         """Monitor and maintain advertising status for multiple connections.
 
         This keeps the device discoverable even when clients are connected,
-        allowing additional phones to discover and connect.
+        allowing additional phones to discover and connect. Checks run when
+        a PropertiesChanged signal arrives, plus a rare safety-net check in
+        case a signal is missed (a faster poll if the subscription failed).
         """
-        print("[BLE] Advertising monitor started")
-        check_interval = 10  # Check every 10 seconds
+        logger.info("Advertising monitor started")
+        check_interval = 60  # Poll interval without signals
+        # With signals, only re-check on a slow heartbeat as a safety net
+        timeout = check_interval * 3 if self._props_subscribed else check_interval
+        if self._props_event is None:
+            self._props_event = asyncio.Event()
 
         while self.is_running:
             try:
-                await asyncio.sleep(check_interval)
+                try:
+                    await asyncio.wait_for(self._props_event.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._props_event.clear()
 
                 if not self.is_running:
                     break
@@ -791,9 +1207,9 @@ class BLEService:
                     is_discoverable = await adapter_props.get_discoverable()
 
                     if not is_discoverable:
-                        print("[BLE] Advertising lost, re-enabling...")
+                        logger.warning("Advertising lost, re-enabling...")
                         await adapter_props.set_discoverable(True)
-                        print("[BLE] Advertising restored")
+                        logger.info("Advertising restored")
                 except Exception as e:
                     # Silently continue if we can't check/restore
                     pass
@@ -801,10 +1217,10 @@ class BLEService:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"[BLE] Advertising monitor error: {e}")
-                await asyncio.sleep(check_interval)
+                logger.error("Advertising monitor error: %s", e)
+                await asyncio.sleep(1)
 
-        print("[BLE] Advertising monitor stopped")
+        logger.info("Advertising monitor stopped")
 
     async def stop(self):
         """Stop the BLE server."""
@@ -824,9 +1240,16 @@ class BLEService:
                     pass
 
             self.is_running = False
-            print("[BLE] Server stopped")
+            if self._props_event is not None:
+                self._props_event.set()  # Let the advertising monitor exit
+            if self.bus is not None:
+                try:
+                    self.bus.remove_message_handler(self._on_properties_changed)
+                except Exception:
+                    pass
+            logger.info("Server stopped")
         except Exception as e:
-            print(f"[BLE] Error stopping: {e}")
+            logger.error("Error stopping: %s", e)
 
 
 # ======================
@@ -886,4 +1309,7 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='[BLE] %(levelname)s %(message)s')
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
@@ -45,11 +45,14 @@ def init_display():
 def display_logo(display, logo_path):
     """Display logo on screen"""
     try:
-        # Load logo
-        logo = Image.open(logo_path).convert("RGB")
+        # Load logo (for JPEGs, draft() lets the decoder scale down while
+        # decoding; PNGs ignore it)
+        logo = Image.open(logo_path)
+        logo.draft("RGB", (display.width, display.height))
+        logo = logo.convert("RGB")
 
         # Resize to fit display
-        logo = logo.resize((display.width, display.height), Image.Resampling.LANCZOS)
+        logo = logo.resize((display.width, display.height), Image.Resampling.BILINEAR)
 
         # Rotate to correct orientation
         if FRAME_ROTATION != 0:
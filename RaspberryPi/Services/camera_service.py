@@ -14,6 +14,7 @@ Classes (16):
 
 import asyncio
 import time
+from collections import deque
 from typing import Optional, Callable, Dict, Any
 from dataclasses import dataclass
 
@@ -45,7 +46,7 @@ except ImportError:
 # Fallback to HTTP API if inference SDK not available
 try:
     import requests
-    import base64
+    from requests.adapters import HTTPAdapter
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
@@ -61,6 +62,8 @@ try:
         ROBOFLOW_MODEL_ID,
         ROBOFLOW_CONFIDENCE_THRESHOLD,
         BEHAVIOR_DETECTION_INTERVAL,
+        ROBOFLOW_BATCH_SIZE,
+        ROBOFLOW_LOCAL_INFERENCE,
     )
 except ImportError:
     # Default values if settings not available
@@ -72,6 +75,8 @@ except ImportError:
     ROBOFLOW_MODEL_ID = "autism-ximav/1"
     ROBOFLOW_CONFIDENCE_THRESHOLD = 0.5
     BEHAVIOR_DETECTION_INTERVAL = 1.0
+    ROBOFLOW_BATCH_SIZE = 1
+    ROBOFLOW_LOCAL_INFERENCE = False
 
 
 # ======================
@@ -97,6 +102,10 @@ AUTISM_BEHAVIOR_CLASSES = [
     "Weird_Expression",
 ]
 
+# Longest side of frames sent for inference. The model runs at 640x640, so
+# larger captures are shrunk first (cheaper JPEG encode and upload).
+INFER_MAX_SIDE = 640
+
 # Behaviors that may indicate distress (could trigger calming response)
 DISTRESS_BEHAVIORS = [
     "Aggressive_Behavior",
@@ -140,8 +149,8 @@ class CameraService:
 
         # Detection state
         self.last_detection: Optional[BehaviorDetection] = None
-        self.detection_history: list = []
         self.max_history = 10
+        self.detection_history: deque = deque(maxlen=self.max_history)  # Oldest dropped automatically
 
         # Callbacks
         self._on_behavior_detected: Optional[Callable] = None
@@ -152,6 +161,30 @@ class CameraService:
         self.model_id = ROBOFLOW_MODEL_ID
         self.confidence_threshold = ROBOFLOW_CONFIDENCE_THRESHOLD
         self.detection_interval = BEHAVIOR_DETECTION_INTERVAL
+        # Frames sent per inference request; the best value depends on the
+        # inference server (GPU memory), and each extra frame adds one
+        # detection_interval of latency before results arrive
+        self.batch_size = max(1, ROBOFLOW_BATCH_SIZE)
+        self._frame_batch: list = []  # (frame, capture timestamp) awaiting inference
+        self._frame_queue: Optional[asyncio.Queue] = None  # Newest captured frame for inference
+        # Captured size / inference size, to map bboxes back to the captured frame
+        self._infer_scale = 1.0
+
+        # Picamera2: capture from the YUV420 lores stream (set on start when
+        # CAMERA_RESOLUTION exceeds INFER_MAX_SIDE)
+        self._use_lores = False
+
+        # Scratch frames reused by capture_jpeg_frame (allocated on first use)
+        self._bgr_buf = None
+        self._resize_buf = None
+
+        # Roboflow SDK client (created on start, reused across frames)
+        self._sdk_client = None
+        # On-device model (ROBOFLOW_LOCAL_INFERENCE); None = use the hosted API
+        self._local_model = None
+
+        # HTTP fallback session (keeps the TLS connection to Roboflow open)
+        self._http_session = None
 
         # Stats
         self.frames_processed = 0
@@ -160,6 +193,7 @@ class CameraService:
     def set_api_key(self, api_key: str):
         """Set Roboflow API key."""
         self.api_key = api_key
+        self._sdk_client = None  # Rebuilt with the new key on next use
 
     def set_model_id(self, model_id: str):
         """Set Roboflow model ID (e.g., 'autism-ximav/1')."""
@@ -195,9 +229,14 @@ class CameraService:
                 return False
             try:
                 self.camera = cv2.VideoCapture(CAMERA_DEVICE_INDEX)
+                # Ask for MJPEG from the webcam (much less USB bandwidth than raw YUYV);
+                # set before the size, as V4L2 picks sizes per pixel format
+                self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
                 self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_RESOLUTION[0])
                 self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_RESOLUTION[1])
                 self.camera.set(cv2.CAP_PROP_FPS, CAMERA_FRAMERATE)
+                # Keep a single driver buffer so read() returns the newest frame, not a queued one
+                self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
                 if not self.camera.isOpened():
                     print(f"[Camera] Failed to open USB webcam at /dev/video{CAMERA_DEVICE_INDEX}")
                     return False
@@ -214,13 +253,28 @@ class CameraService:
                 return False
             try:
                 self.camera = Picamera2()
-                config = self.camera.create_preview_configuration(
-                    main={"size": CAMERA_RESOLUTION, "format": "RGB888"}
-                )
+                if OPENCV_AVAILABLE and max(CAMERA_RESOLUTION) > INFER_MAX_SIDE:
+                    # Larger than the inference size: let the ISP scale frames
+                    # into a YUV420 lores stream and read only that. Main is
+                    # never read, so it is YUV420 too (half the bytes of RGB888)
+                    scale = INFER_MAX_SIDE / max(CAMERA_RESOLUTION)
+                    lores_size = (int(CAMERA_RESOLUTION[0] * scale) & ~1,
+                                  int(CAMERA_RESOLUTION[1] * scale) & ~1)
+                    config = self.camera.create_video_configuration(
+                        main={"size": CAMERA_RESOLUTION, "format": "YUV420"},
+                        lores={"size": lores_size, "format": "YUV420"},
+                        buffer_count=3,
+                    )
+                    self._use_lores = True
+                else:
+                    config = self.camera.create_preview_configuration(
+                        main={"size": CAMERA_RESOLUTION, "format": "RGB888"}
+                    )
+                    self._use_lores = False
                 self.camera.configure(config)
                 self.camera.start()
                 self.camera_type = "picamera"
-                print("[Camera] Picamera2 initialized")
+                print(f"[Camera] Picamera2 initialized{' (lores YUV420 capture)' if self._use_lores else ''}")
             except Exception as e:
                 print(f"[Camera] Failed to initialize Picamera2: {e}")
                 return False
@@ -229,6 +283,26 @@ class CameraService:
             print("[Camera] Valid options: 'usb' or 'picamera'")
             return False
 
+        if ROBOFLOW_AVAILABLE and ROBOFLOW_LOCAL_INFERENCE:
+            try:
+                from inference import get_model
+                # First load downloads the weights - keep it off the event loop
+                loop = asyncio.get_event_loop()
+                self._local_model = await loop.run_in_executor(
+                    None,
+                    lambda: get_model(model_id=self.model_id, api_key=self.api_key)
+                )
+                print(f"[Camera] Running {self.model_id} locally")
+            except Exception as e:
+                print(f"[Camera] Warning: Local model not loaded, using hosted API: {e}")
+                self._local_model = None
+
+        if ROBOFLOW_AVAILABLE:
+            try:
+                self._create_sdk_client()
+            except Exception as e:
+                print(f"[Camera] Warning: Roboflow SDK client not created: {e}")
+
         self.is_running = True
         print("[Camera] Service started")
         return True
@@ -258,6 +332,12 @@ class CameraService:
                 pass
             self.pipeline = None
 
+        self._sdk_client = None
+        self._local_model = None
+        if self._http_session:
+            self._http_session.close()
+            self._http_session = None
+
         print("[Camera] Service stopped")
 
     def capture_frame(self) -> Optional[Any]:
@@ -282,7 +362,14 @@ class CameraService:
                         self._read_fail_logged = True
                     return None
             elif self.camera_type == "picamera":
-                # Pi Camera Module (Picamera2) - returns RGB888
+                # Pi Camera Module (Picamera2)
+                if self._use_lores:
+                    # I420 planes (height * 3/2 rows) -> RGB. A fresh array per
+                    # frame: callers may hold frames (inference batches), so a
+                    # view into the camera's buffer can't be handed out
+                    yuv = self.camera.capture_array("lores")
+                    return cv2.cvtColor(yuv, cv2.COLOR_YUV2RGB_I420)
+                # Main stream - returns RGB888
                 return self.camera.capture_array()
             else:
                 return None
@@ -316,12 +403,14 @@ class CameraService:
             return None
 
         try:
-            # Convert RGB to BGR for OpenCV encoding
-            bgr_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+            # Convert RGB to BGR for OpenCV encoding. The output buffers are
+            # reused between frames; OpenCV reallocates them (and we keep the
+            # new one) if the size changes.
+            bgr_frame = self._bgr_buf = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR, dst=self._bgr_buf)
 
             # Resize if requested
             if resolution and resolution != (frame.shape[1], frame.shape[0]):
-                bgr_frame = cv2.resize(bgr_frame, resolution)
+                bgr_frame = self._resize_buf = cv2.resize(bgr_frame, resolution, dst=self._resize_buf)
 
             # Encode as JPEG
             encode_params = [cv2.IMWRITE_JPEG_QUALITY, quality]
@@ -346,41 +435,88 @@ class CameraService:
             return None
 
     async def run_detection_loop(self):
-        """Main detection loop - captures frames and runs inference."""
+        """Main detection loop - captures frames and runs inference.
+
+        Capture and inference run as separate tasks joined by a one-slot
+        queue: a slow inference request never delays the next capture, and
+        the inference side always picks up the newest frame (older ones are
+        dropped).
+        """
         print("[Camera] Starting behavior detection loop")
 
+        self._frame_queue = asyncio.Queue(maxsize=1)
+        try:
+            await asyncio.gather(self._capture_loop(), self._inference_loop())
+        except asyncio.CancelledError:
+            pass
+
+        print("[Camera] Detection loop stopped")
+
+    async def _capture_loop(self):
+        """Capture a frame every detection_interval into the frame queue."""
         while self.is_running:
             try:
-                await self._process_frame()
+                frame = self.capture_frame()
+                if frame is not None:
+                    if self._frame_queue.full():
+                        self._frame_queue.get_nowait()  # Drop the stale frame
+                    self._frame_queue.put_nowait((frame, time.time()))
                 await asyncio.sleep(self.detection_interval)
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                print(f"[Camera] Detection loop error: {e}")
+                print(f"[Camera] Capture loop error: {e}")
                 await asyncio.sleep(1)
 
-        print("[Camera] Detection loop stopped")
-
-    async def _process_frame(self):
-        """Process a single frame for behavior detection."""
-        frame = self.capture_frame()
+    async def _inference_loop(self):
+        """Run detection on the newest queued frame."""
+        while self.is_running:
+            try:
+                try:
+                    frame, timestamp = await asyncio.wait_for(self._frame_queue.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue  # Re-check is_running
+                await self._process_frame(frame, timestamp)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"[Camera] Detection loop error: {e}")
+                await asyncio.sleep(1)
 
-        if frame is None:
+    async def _process_frame(self, frame, timestamp: float):
+        """Queue a captured frame and run behavior detection once a batch is full."""
+        self.frames_processed += 1
+        frame = self._shrink_for_inference(frame)
+        self._frame_batch.append((frame, timestamp))
+        if len(self._frame_batch) < self.batch_size:
             return
 
-        self.frames_processed += 1
+        frames, self._frame_batch = self._frame_batch, []
 
         # Run inference
-        detection = await self._run_inference(frame)
-
+        for detection in await self._run_inference(frames):
+            self._handle_detection(detection)
+
+    def _shrink_for_inference(self, frame):
+        """Downscale a frame to at most INFER_MAX_SIDE on its longest side."""
+        height, width = frame.shape[:2]
+        longest = max(height, width)
+        if longest <= INFER_MAX_SIDE or not OPENCV_AVAILABLE:
+            self._infer_scale = 1.0
+            return frame
+        scale = INFER_MAX_SIDE / longest
+        self._infer_scale = 1.0 / scale
+        size = (round(width * scale), round(height * scale))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def _handle_detection(self, detection: BehaviorDetection):
+        """Record a detection and notify callbacks."""
         if detection:
             self.last_detection = detection
             self.detections_count += 1
 
             # Add to history
             self.detection_history.append(detection)
-            if len(self.detection_history) > self.max_history:
-                self.detection_history.pop(0)
 
             # Notify callbacks
             if self._on_behavior_detected:
@@ -392,47 +528,90 @@ class CameraService:
                 if self._on_distress_behavior:
                     self._on_distress_behavior(detection)
 
-    async def _run_inference(self, frame) -> Optional[BehaviorDetection]:
-        """Run Roboflow inference on a frame."""
+    async def _run_inference(self, frames: list) -> list:
+        """Run Roboflow inference on a batch of (frame, timestamp) pairs.
+
+        Returns the detections found, in capture order.
+        """
         try:
-            if ROBOFLOW_AVAILABLE:
-                return await self._run_inference_sdk(frame)
+            if self._local_model is not None:
+                return await self._run_inference_local(frames)
+            elif ROBOFLOW_AVAILABLE:
+                return await self._run_inference_sdk(frames)
             elif REQUESTS_AVAILABLE:
-                return await self._run_inference_http(frame)
+                detections = []
+                for frame, timestamp in frames:
+                    detection = await self._run_inference_http(frame, timestamp)
+                    if detection:
+                        detections.append(detection)
+                return detections
             else:
                 print("[Camera] No inference method available")
-                return None
+                return []
         except Exception as e:
             print(f"[Camera] Inference error: {e}")
-            return None
+            return []
 
-    async def _run_inference_sdk(self, frame) -> Optional[BehaviorDetection]:
-        """Run inference using Roboflow SDK."""
+    async def _run_inference_local(self, frames: list) -> list:
+        """Run inference on the Pi with the locally loaded model (no network)."""
+        images = [frame for frame, _ in frames]
+
+        # Run in executor to avoid blocking
+        loop = asyncio.get_event_loop()
+        responses = await loop.run_in_executor(
+            None,
+            lambda: self._local_model.infer(images, confidence=self.confidence_threshold)
+        )
+
+        detections = []
+        for response, (_, timestamp) in zip(responses, frames):
+            # Same shape as the hosted API's JSON ("class", "confidence", x/y/width/height)
+            detection = self._parse_roboflow_result(response.model_dump(by_alias=True), timestamp)
+            if detection:
+                detections.append(detection)
+        return detections
+
+    def _create_sdk_client(self):
+        """Create the Roboflow SDK client, reused for every inference request."""
         # Import here to avoid issues if not installed
         from inference_sdk import InferenceHTTPClient
 
-        client = InferenceHTTPClient(
+        self._sdk_client = InferenceHTTPClient(
             api_url="https://detect.roboflow.com",
             api_key=self.api_key,
         )
+        return self._sdk_client
+
+    async def _run_inference_sdk(self, frames: list) -> list:
+        """Run inference using Roboflow SDK (one request for the whole batch)."""
+        client = self._sdk_client or self._create_sdk_client()
+
+        images = [frame for frame, _ in frames]
+        inputs = images if len(images) > 1 else images[0]
 
         # Run in executor to avoid blocking
         loop = asyncio.get_event_loop()
         result = await loop.run_in_executor(
             None,
-            lambda: client.infer(frame, model_id=self.model_id)
+            lambda: client.infer(inputs, model_id=self.model_id)
         )
 
-        return self._parse_roboflow_result(result)
+        results = result if isinstance(result, list) else [result]
+        detections = []
+        for item, (_, timestamp) in zip(results, frames):
+            detection = self._parse_roboflow_result(item, timestamp)
+            if detection:
+                detections.append(detection)
+        return detections
 
-    async def _run_inference_http(self, frame) -> Optional[BehaviorDetection]:
+    async def _run_inference_http(self, frame, timestamp: Optional[float] = None) -> Optional[BehaviorDetection]:
         """Run inference using HTTP API (fallback)."""
         import cv2
         import numpy as np
 
-        # Encode frame as JPEG
+        # Encode frame as JPEG (uploaded as-is, no base64 inflation)
         _, buffer = cv2.imencode('.jpg', frame)
-        img_base64 = base64.b64encode(buffer).decode('utf-8')
+        jpeg = buffer.tobytes()
 
         # API endpoint
         url = f"https://detect.roboflow.com/{self.model_id}"
@@ -442,24 +621,31 @@ class CameraService:
             "confidence": self.confidence_threshold,
         }
 
+        if self._http_session is None:
+            self._http_session = requests.Session()
+            self._http_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        session = self._http_session
+
         # Run in executor to avoid blocking
         loop = asyncio.get_event_loop()
 
         def make_request():
-            response = requests.post(
+            response = session.post(
                 url,
                 params=params,
-                data=img_base64,
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                files={"file": ("frame.jpg", jpeg, "image/jpeg")},
                 timeout=10,
             )
             return response.json()
 
         result = await loop.run_in_executor(None, make_request)
-        return self._parse_roboflow_result(result)
+        return self._parse_roboflow_result(result, timestamp)
+
+    def _parse_roboflow_result(self, result: dict, timestamp: Optional[float] = None) -> Optional[BehaviorDetection]:
+        """Parse Roboflow API response into BehaviorDetection.
 
-    def _parse_roboflow_result(self, result: dict) -> Optional[BehaviorDetection]:
-        """Parse Roboflow API response into BehaviorDetection."""
+        timestamp is when the frame was captured (defaults to now).
+        """
         predictions = result.get("predictions", [])
 
         if not predictions:
@@ -477,17 +663,18 @@ class CameraService:
         # Get bounding box if available
         bbox = None
         if all(k in best for k in ["x", "y", "width", "height"]):
+            scale = self._infer_scale  # Back to captured-frame coordinates
             bbox = (
-                best["x"] - best["width"] / 2,  # Convert center to top-left
-                best["y"] - best["height"] / 2,
-                best["width"],
-                best["height"],
+                (best["x"] - best["width"] / 2) * scale,  # Convert center to top-left
+                (best["y"] - best["height"] / 2) * scale,
+                best["width"] * scale,
+                best["height"] * scale,
             )
 
         return BehaviorDetection(
             label=label,
             confidence=confidence,
-            timestamp=time.time(),
+            timestamp=timestamp if timestamp is not None else time.time(),
             bbox=bbox,
         )
 
@@ -520,6 +707,7 @@ class CameraService:
             "picamera_available": PICAMERA_AVAILABLE,
             "opencv_available": OPENCV_AVAILABLE,
             "roboflow_available": ROBOFLOW_AVAILABLE or REQUESTS_AVAILABLE,
+            "local_inference": self._local_model is not None,
         }
 
 
@@ -87,6 +87,22 @@ _on_distress_callback = None
 _last_volume = None
 _last_volume_time = 0
 
+# Bumped whenever a value reported by get_settings() changes, so readers
+# (the BLE settings/status characteristics) can reuse their encoded copy
+_settings_version = 0
+
+
+def _settings_changed():
+    """Mark the get_settings() values as changed."""
+    global _settings_version
+    _settings_version += 1
+
+
+def get_settings_version() -> int:
+    """Return a counter that changes whenever get_settings() would change."""
+    is_esp32_connected()  # Applies the connection timeout (may bump the version)
+    return _settings_version
+
 def set_on_esp32_data_callback(callback):
     """Set callback for when ESP32 sensor data is received.
 
@@ -121,6 +137,7 @@ def update_esp32_connection():
     _esp32_connected = True
     _esp32_last_data_time = time.time()
     if not was_connected:
+        _settings_changed()
         print(f"[ESP32] 🟢 Connection status changed: CONNECTED (received data)")
 
 
@@ -130,15 +147,18 @@ def is_esp32_connected():
     if _esp32_last_data_time == 0:
         return False
     # Check if we received data within the timeout period
-    if time.time() - _esp32_last_data_time > ESP32_CONNECTION_TIMEOUT:
+    if _esp32_connected and time.time() - _esp32_last_data_time > ESP32_CONNECTION_TIMEOUT:
         _esp32_connected = False
+        _settings_changed()
     return _esp32_connected
 
 
 def set_esp32_beacon_detected(detected: bool):
     """Set ESP32 BLE beacon detection status."""
     global _esp32_beacon_detected
-    _esp32_beacon_detected = detected
+    if detected != _esp32_beacon_detected:
+        _esp32_beacon_detected = detected
+        _settings_changed()
 
 
 def is_esp32_beacon_detected():
@@ -465,6 +485,7 @@ def set_animation(animation_id):
     global current_animation
     if 1 <= animation_id <= 5:
         current_animation = animation_id
+        _settings_changed()
         print(f"Animation set to {animation_id}")
         return True
     return False
@@ -475,6 +496,7 @@ def set_sound(sound_id):
     global current_sound
     if 1 <= sound_id <= 13:
         current_sound = sound_id
+        _settings_changed()
         print(f"Sound set to {sound_id}: {SOUNDS.get(sound_id, 'Unknown')}")
         return True
     return False
@@ -491,6 +513,7 @@ def enable_animation(enabled):
     """Enable or disable animation response."""
     global animation_enabled
     animation_enabled = enabled
+    _settings_changed()
     print(f"Animation {'enabled' if enabled else 'disabled'}")
 
 
@@ -498,6 +521,7 @@ def enable_sound(enabled):
     """Enable or disable sound response."""
     global sound_enabled
     sound_enabled = enabled
+    _settings_changed()
     print(f"Sound {'enabled' if enabled else 'disabled'}")
 
 
@@ -509,6 +533,7 @@ def set_child_profile_active(active: bool):
     """
     global child_profile_active
     child_profile_active = active
+    _settings_changed()
     print(f"[Profile] Child profile {'activated' if active else 'deactivated'}")
 
 
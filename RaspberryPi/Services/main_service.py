@@ -13,6 +13,13 @@ import threading
 import signal
 import sys
 
+# Faster event loop (libuv) if installed
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # Import services
 from services.distress_service import (
     start_listener,
@@ -43,6 +50,7 @@ try:
         BEACON_RSSI_SAMPLES,
         BEACON_LOST_TIMEOUT,
         BEACON_ZONE_DEBOUNCE,
+        BEACON_RAW_HCI_SCAN,
     )
 except ImportError:
     # Default values if settings not available
@@ -56,10 +64,12 @@ except ImportError:
     BEACON_RSSI_SAMPLES = 5
     BEACON_LOST_TIMEOUT = 10.0
     BEACON_ZONE_DEBOUNCE = 3
+    BEACON_RAW_HCI_SCAN = False
 
 
 # BLE Notification Configuration
 BLE_NOTIFICATION_INTERVAL = 5.0  # Send BLE notifications every 5 seconds
+BLE_HEARTBEAT_TICKS = 6  # Unchanged payloads are still re-sent every 6th interval (30s)
 
 
 class MainService:
@@ -250,7 +260,7 @@ class MainService:
         if self.ble_service and self.ble_service.service:
             self.ble_service.service.update_distress_data(alert_type, distress_type, distress_motion)
             # Send immediate BLE notification on distress (don't wait for periodic)
-            self.ble_service.service.notify_sensor_data()
+            self.ble_service.service.notify_sensor_data(force=True)
             print(f"[Main] Sent immediate BLE notification for distress alert")
 
     def _on_dht22_reading(self, reading: dict):
@@ -263,14 +273,14 @@ class MainService:
                 # Update BLE sensor payload with latest temperature
                 if self.ble_service and self.ble_service.service:
                     self.ble_service.service.update_sensor_data(
-                        pressure=self.ble_service.service._sensor_data["pressure"],
-                        pressure_type=self.ble_service.service._sensor_data["pressureType"],
+                        pressure=self.ble_service.service._sensor_data.pressure,
+                        pressure_type=self.ble_service.service._sensor_data.pressureType,
                         temperature=temperature,
-                        motion=self.ble_service.service._sensor_data["motion"],
+                        motion=self.ble_service.service._sensor_data.motion,
                         proximity_zone=self.current_zone.value,
-                        distress_alert=self.ble_service.service._sensor_data["distressAlert"],
-                        distress_type=self.ble_service.service._sensor_data["distressType"],
-                        distress_motion=self.ble_service.service._sensor_data["distressMotion"],
+                        distress_alert=self.ble_service.service._sensor_data.distressAlert,
+                        distress_type=self.ble_service.service._sensor_data.distressType,
+                        distress_motion=self.ble_service.service._sensor_data.distressMotion,
                         environmental_noise=self.current_noise_level,
                         noise_level=self.current_noise_category,
                     )
@@ -290,14 +300,14 @@ class MainService:
             if self.ble_service and self.ble_service.service:
                 current = self.ble_service.service._sensor_data
                 self.ble_service.service.update_sensor_data(
-                    pressure=current["pressure"],
-                    pressure_type=current["pressureType"],
+                    pressure=current.pressure,
+                    pressure_type=current.pressureType,
                     temperature=self.current_temperature,
-                    motion=current["motion"],
+                    motion=current.motion,
                     proximity_zone=self.current_zone.value,
-                    distress_alert=current["distressAlert"],
-                    distress_type=current["distressType"],
-                    distress_motion=current["distressMotion"],
+                    distress_alert=current.distressAlert,
+                    distress_type=current.distressType,
+                    distress_motion=current.distressMotion,
                     environmental_noise=db_level,
                     noise_level=category,
                 )
@@ -316,7 +326,7 @@ class MainService:
 
             # Send immediate BLE notification (don't wait for periodic interval)
             if self.ble_service and self.ble_service.service:
-                self.ble_service.service.notify_sensor_data()
+                self.ble_service.service.notify_sensor_data(force=True)
                 print(f"[Main] Sent immediate BLE notification for high noise alert")
         except Exception as e:
             print(f"[Main] Error processing high noise alert: {e}")
@@ -331,6 +341,7 @@ class MainService:
         - Behavior: Most frequent, first occurrence wins on ties, "none" if empty
         """
         print(f"[Main] Starting BLE notification loop (every {BLE_NOTIFICATION_INTERVAL}s)")
+        tick = 0
 
         while self.running:
             try:
@@ -352,7 +363,7 @@ class MainService:
                     # Update BLE sensor data with aggregated values
                     self.ble_service.service.update_sensor_data(
                         pressure=aggregated_pressure,
-                        pressure_type=current_data.get("pressureType", "none"),
+                        pressure_type=current_data.pressureType,
                         temperature=self.current_temperature,
                         motion=aggregated_motion,
                         proximity_zone=self.current_zone.value,
@@ -374,9 +385,11 @@ class MainService:
                     self._motion_buffer.clear()
                     self._behavior_buffer.clear()
 
-                    # Send sensor, behavior, and status data
-                    self.ble_service.service.notify_all()
-                    self.ble_service.service.notify_status()  # Send esp32_connected status
+                    # Send sensor, behavior, and status (esp32_connected) data in
+                    # one batch (unchanged sensor/behavior payloads are skipped
+                    # except on heartbeat ticks)
+                    tick += 1
+                    self.ble_service.service.notify_batch(force=tick % BLE_HEARTBEAT_TICKS == 0)
                     print(f"[Main] Sent periodic BLE notification (aggregated: pressure={aggregated_pressure:.2f}, motion={aggregated_motion}, behavior={aggregated_behavior})")
 
             except asyncio.CancelledError:
@@ -481,6 +494,7 @@ class MainService:
             rssi_samples=BEACON_RSSI_SAMPLES,
             lost_timeout=BEACON_LOST_TIMEOUT,
             zone_change_threshold=BEACON_ZONE_DEBOUNCE,
+            raw_hci_scan=BEACON_RAW_HCI_SCAN,
         )
 
     async def wait_for_bluetooth_ready(self, timeout=20):
@@ -823,4 +837,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
@@ -59,6 +59,7 @@ BEACON_SCAN_DURATION = 3.0  # Duration of each scan (longer window to catch adve
 BEACON_RSSI_SAMPLES = 8     # Number of samples to average for smoothing (better noise reduction)
 BEACON_LOST_TIMEOUT = 25.0  # Seconds before marking device as OUT_OF_RANGE (tolerant of gaps)
 BEACON_ZONE_DEBOUNCE = 3    # Consecutive readings needed to change zone (prevents flickering)
+BEACON_RAW_HCI_SCAN = False # Scan on a raw HCI socket (needs root; bypasses bluetoothd)
 
 # ======================
 # WiFi/ESP32 Configuration
@@ -92,6 +93,8 @@ ROBOFLOW_API_KEY = "bplvUh0xwWNAPCg8VJf2"  # Get from https://app.roboflow.com -
 ROBOFLOW_MODEL_ID = "autism-ximav/1"  # Model ID from Roboflow
 ROBOFLOW_CONFIDENCE_THRESHOLD = 0.5  # Minimum confidence to report detection (0.0-1.0)
 BEHAVIOR_DETECTION_INTERVAL = 1.0  # Seconds between detection runs
+ROBOFLOW_BATCH_SIZE = 1  # Frames per inference request (>1 raises throughput but delays detections by batch_size * interval)
+ROBOFLOW_LOCAL_INFERENCE = False  # Run the model on the Pi (inference package) instead of the hosted API
 
 # ======================
 # Display Configuration